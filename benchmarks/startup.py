@@ -0,0 +1,144 @@
+"""Worker startup cost: import time and time to first byte.
+
+Each entry point is started in a fresh interpreter, with and without the
+warm-up (BLOG_WARM_UP in AppConfig.ready plus warm_connections() as a
+post-fork hook would run it). Uses the database configured in the
+environment. Run from the repository root:
+
+    python benchmarks/startup.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNS = 3
+PATH = '/api/v1/posts/'
+
+# Runs in the child interpreter and prints its timings as JSON.
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+entry, warm, path = sys.argv[1], sys.argv[2] == '1', sys.argv[3]
+
+if entry == 'wsgi':
+    from config.wsgi import application
+else:
+    from config.asgi import application
+imported = time.perf_counter()
+
+from django.conf import settings
+settings.ALLOWED_HOSTS = ['localhost']
+if warm:
+    from blog.warmup import warm_connections
+    warm_connections()
+ready = time.perf_counter()
+
+
+def wsgi_request():
+    from django.test import RequestFactory
+    environ = RequestFactory().get(path, HTTP_HOST='localhost').environ
+    body = application(environ, lambda status, headers: None)
+    next(iter(body))
+
+
+def asgi_request():
+    import asyncio
+
+    async def request():
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': path,
+            'query_string': b'', 'headers': [(b'host', b'localhost')],
+        }
+        messages = iter([{'type': 'http.request', 'body': b''}])
+        received = asyncio.Event()
+
+        async def receive():
+            # Stay connected until the response is complete.
+            if message := next(messages, None):
+                return message
+            await asyncio.Future()
+
+        async def send(message):
+            if message['type'] == 'http.response.body':
+                received.set()
+
+        await application(scope, receive, send)
+        await received.wait()
+
+    asyncio.run(request())
+
+
+serve = wsgi_request if entry == 'wsgi' else asgi_request
+serve()
+first = time.perf_counter()
+serve()
+second = time.perf_counter()
+print(json.dumps({
+    'import': imported - start,
+    'warm_up': ready - imported,
+    'first_byte': first - ready,
+    'second_byte': second - first,
+}))
+"""
+
+
+def run(args, warm):
+    env = {**os.environ, 'BLOG_WARM_UP': '1' if warm else '0'}
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+def entry_point(entry, warm):
+    timings = [
+        json.loads(
+            run(['-c', CHILD, entry, str(int(warm)), PATH], warm).stdout
+        )
+        for _ in range(RUNS)
+    ]
+    return {key: min(t[key] for t in timings) for key in timings[0]}
+
+
+def manage(warm):
+    best = float('inf')
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        run(['manage.py', 'check'], warm)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def ms(seconds):
+    return f'{seconds * 1000:>9.1f}'
+
+
+def main():
+    print(
+        f'{"entry point":<22}{"import":>9}{"warm-up":>9}'
+        f'{"1st byte":>9}{"2nd byte":>9}  (ms, best of {RUNS})'
+    )
+    for entry in ('wsgi', 'asgi'):
+        for warm in (False, True):
+            t = entry_point(entry, warm)
+            name = f'{entry}{" +warm" if warm else ""}'
+            print(
+                f'{name:<22}{ms(t["import"])}{ms(t["warm_up"])}'
+                f'{ms(t["first_byte"])}{ms(t["second_byte"])}'
+            )
+    for warm in (False, True):
+        name = f'manage.py check{" +warm" if warm else ""}'
+        print(f'{name:<22}{ms(manage(warm))}  (whole process)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Per-request overhead of the API throttles.
+
+Run from the repository root:
+
+    python benchmarks/throttling.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import django
+from django.conf import settings
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+settings.configure(
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    },
+    REST_FRAMEWORK={
+        'UNAUTHENTICATED_USER': None,
+        'DEFAULT_THROTTLE_RATES': {
+            'list': '1000000000/min',
+            'anon': '1000000000/min',
+        },
+    },
+    BLOG_THROTTLE_BACKEND='blog.throttling.LocalBackend',
+)
+django.setup()
+
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from rest_framework.throttling import AnonRateThrottle  # noqa: E402
+
+from blog.throttling import (  # noqa: E402
+    CacheBackend,
+    LocalBackend,
+    SlidingWindowThrottle,
+)
+
+NUMBER = 100_000
+CLIENTS = 1_000
+
+
+class View:
+    throttle_scope = 'list'
+
+
+def requests():
+    factory = APIRequestFactory()
+    return [
+        Request(
+            factory.get(
+                '/api/v1/posts/', REMOTE_ADDR=f'10.0.{i // 256}.{i % 256}'
+            )
+        )
+        for i in range(CLIENTS)
+    ]
+
+
+def report(name, seconds):
+    print(f'{name:<40} {seconds / NUMBER * 1e9:>10.0f} ns/op')
+
+
+def main():
+    clock = iter(range(10**9)).__next__
+    for backend in (LocalBackend(), CacheBackend()):
+        keys = [f'list:anon:{i}' for i in range(CLIENTS)]
+        seconds = timeit.timeit(
+            lambda: backend.hit(keys[clock() % CLIENTS], 10**9, 60, 1.0),
+            number=NUMBER,
+        )
+        report(f'{type(backend).__name__}.hit', seconds)
+
+    pool = requests()
+    view = View()
+    for throttle_class in (SlidingWindowThrottle, AnonRateThrottle):
+        seconds = timeit.timeit(
+            lambda: throttle_class().allow_request(
+                pool[clock() % CLIENTS], view
+            ),
+            number=NUMBER,
+        )
+        report(f'{throttle_class.__name__}.allow_request', seconds)
+
+
+if __name__ == '__main__':
+    main()
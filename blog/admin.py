@@ -1,6 +1,50 @@
 from django.contrib import admin
+from django.contrib.postgres.search import SearchQuery
+from django.http import FileResponse, Http404
+from django.template.response import TemplateResponse
 
-from .models import Post, Tag
+from .models import SEARCH_VECTOR, Post, Tag, Task
+from .pagination import EstimatedCountPaginator
+from .profiling import list_profiles, load_profile
+
+
+class InputFilter(admin.SimpleListFilter):
+    template = 'admin/blog/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        # The free-text input replaces the list of choices, so rendering the
+        # filter never loads the related table.
+        return ()
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        yield {
+            'query_parts': [
+                (key, value)
+                for key, value in changelist.params.items()
+                if key != self.parameter_name
+            ]
+        }
+
+
+class AuthorFilter(InputFilter):
+    title = 'author'
+    parameter_name = 'author'
+
+    def queryset(self, request, queryset):
+        if username := self.value():
+            return queryset.filter(author__username=username)
+
+
+class TagFilter(InputFilter):
+    title = 'tag'
+    parameter_name = 'tag'
+
+    def queryset(self, request, queryset):
+        if name := self.value():
+            return queryset.filter(tags__name=name)
 
 
 @admin.register(Tag)
@@ -12,16 +56,66 @@ class TagAdmin(admin.ModelAdmin):
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'status', 'published_at', 'created_at')
-    list_filter = ('status', 'author', 'tags')
-    search_fields = ('title', 'content', 'author__username')
+    list_filter = ('status', AuthorFilter, TagFilter, 'published_at')
+    list_select_related = ('author',)
+    search_fields = ('title', 'content')
+    search_help_text = 'Full-text search over title and content.'
     prepopulated_fields = {'slug': ('title',)}
-    date_hierarchy = 'published_at'
     ordering = ('-published_at',)
-    filter_horizontal = ('tags',)
+    autocomplete_fields = ('tags',)
     readonly_fields = ('created_at', 'updated_at', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+
+        # Matches the expression of the GIN index on Post, unlike the
+        # default ILIKE '%term%' lookups which scan the whole table.
+        query = SearchQuery(
+            search_term, config='english', search_type='websearch'
+        )
+        return queryset.alias(search=SEARCH_VECTOR).filter(search=query), False
 
     def save_model(self, request, obj, form, change):
         if not change:
             obj.author = request.user
 
         super().save_model(request, obj, form, change)
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key', 'attempts', 'run_after', 'created_at')
+    list_filter = ('name',)
+    search_fields = ('key',)
+    readonly_fields = ('name', 'key', 'args', 'version', 'created_at')
+    ordering = ('run_after',)
+
+
+def profile_list(request):
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Request profiles',
+        'profiles': list_profiles(),
+    }
+    return TemplateResponse(request, 'admin/blog/profile_list.html', context)
+
+
+def profile_detail(request, profile_id):
+    profile = load_profile(profile_id)
+    if profile is None:
+        raise Http404('No such profile.')
+    if 'download' in request.GET:
+        return FileResponse(
+            open(profile['data_path'], 'rb'), as_attachment=True
+        )
+
+    context = {
+        **admin.site.each_context(request),
+        'title': f'{profile["method"]} {profile["path"]}',
+        'profile': profile,
+    }
+    return TemplateResponse(request, 'admin/blog/profile_detail.html', context)
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import signals  # noqa: F401
+
+        if settings.BLOG_WARM_UP:
+            from .warmup import warm_caches
+
+            warm_caches()
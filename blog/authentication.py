@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import salted_hmac
+from rest_framework.authentication import (
+    BaseAuthentication,
+    get_authorization_header,
+)
+from rest_framework.exceptions import AuthenticationFailed
+
+User = get_user_model()
+
+TOKEN_SALT = 'blog.authentication.token'
+
+
+class UserCache:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, pk):
+        with self.lock:
+            entry = self.entries.get(pk)
+            if entry is None:
+                return None
+
+            user, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[pk]
+                return None
+
+            self.entries.move_to_end(pk)
+            return user
+
+    def set(self, pk, user):
+        with self.lock:
+            self.entries[pk] = (user, time.monotonic() + self.ttl)
+            self.entries.move_to_end(pk)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, pk):
+        with self.lock:
+            self.entries.pop(pk, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(
+    maxsize=settings.BLOG_TOKEN_USER_CACHE_SIZE,
+    ttl=settings.BLOG_TOKEN_USER_CACHE_TTL,
+)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+def get_cached_user(pk):
+    user = user_cache.get(pk)
+    if user is None:
+        user = User.objects.filter(pk=pk).first()
+        if user is not None:
+            user_cache.set(pk, user)
+    return user
+
+
+def password_fingerprint(user):
+    # Changing the password changes the fingerprint, which revokes every
+    # token issued before the change.
+    return salted_hmac(TOKEN_SALT, user.password).hexdigest()[:16]
+
+
+def issue_token(user):
+    return signing.dumps(
+        {'uid': user.pk, 'pwd': password_fingerprint(user)}, salt=TOKEN_SALT
+    )
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) != 2:
+            raise AuthenticationFailed('Invalid token header.')
+
+        try:
+            payload = signing.loads(
+                auth[1].decode(),
+                salt=TOKEN_SALT,
+                max_age=settings.BLOG_TOKEN_MAX_AGE,
+            )
+        except signing.SignatureExpired:
+            raise AuthenticationFailed('Token has expired.')
+        except (signing.BadSignature, UnicodeDecodeError):
+            raise AuthenticationFailed('Invalid token.')
+
+        user = get_cached_user(payload['uid'])
+        if (
+            user is None
+            or not user.is_active
+            or payload['pwd'] != password_fingerprint(user)
+        ):
+            raise AuthenticationFailed('Invalid token.')
+
+        return (user, payload)
+
+    def authenticate_header(self, request):
+        return self.keyword
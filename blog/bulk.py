@@ -0,0 +1,29 @@
+from itertools import islice
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def reserve_ids(cursor, table, count):
+    # Advancing the sequence in one statement hands out a contiguous block of
+    # ids, so rows can be linked to each other before they are loaded.
+    if not count:
+        return range(0)
+
+    cursor.execute(
+        "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+        "nextval(pg_get_serial_sequence(%s, 'id')) + %s - 1)",
+        [table, table, count],
+    )
+    last = cursor.fetchone()[0]
+    return range(last - count + 1, last + 1)
+
+
+def copy_rows(cursor, table, columns, rows):
+    sql = f'COPY {table} ({", ".join(columns)}) FROM STDIN'
+    with cursor.copy(sql) as copy:
+        for row in rows:
+            copy.write_row(row)
@@ -0,0 +1,71 @@
+import heapq
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Post, PostTombstone
+
+
+def encode_cursor(changed_at, pk):
+    position = f'{changed_at.isoformat()}|{pk}'
+    return urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        position = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        changed_at, pk = position.decode().split('|')
+        changed_at = datetime.fromisoformat(changed_at)
+        pk = int(pk)
+    except ValueError:
+        return None
+    if timezone.is_naive(changed_at):
+        return None
+    return changed_at, pk
+
+
+def after(queryset, time_field, pk_field, since):
+    # (time, pk) > since, written so that the (time, pk) index serves it as
+    # a range scan.
+    if since is None:
+        return queryset
+    changed_at, pk = since
+    return queryset.filter(**{f'{time_field}__gte': changed_at}).filter(
+        Q(**{f'{time_field}__gt': changed_at}) | Q(**{f'{pk_field}__gt': pk})
+    )
+
+
+def get_changes(since, limit):
+    # Returns up to `limit` (changed_at, pk, post) triples after `since`,
+    # where post is None for a tombstone: a post that was public and has
+    # since been deleted or unpublished. Changes to posts that are not
+    # public are left out, so drafts never show up.
+    now = timezone.now()
+    horizon = now - timedelta(seconds=settings.BLOG_CHANGES_LAG)
+
+    posts = after(
+        Post.objects.filter(
+            updated_at__lte=horizon, status='published', published_at__lte=now
+        ),
+        'updated_at',
+        'id',
+        since,
+    ).order_by('updated_at', 'id')
+    tombstones = after(
+        PostTombstone.objects.filter(deleted_at__lte=horizon),
+        'deleted_at',
+        'post_id',
+        since,
+    ).order_by('deleted_at', 'post_id')
+
+    posts = posts.select_related('author').prefetch_related('tags')
+    updated = [(post.updated_at, post.pk, post) for post in posts[: limit + 1]]
+    deleted = (
+        (tombstone.deleted_at, tombstone.post_id, None)
+        for tombstone in tombstones[: limit + 1]
+    )
+    changes = list(heapq.merge(updated, deleted, key=lambda c: c[:2]))
+    return changes[:limit], len(changes) > limit
@@ -0,0 +1,146 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from functools import cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connection
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# One statement for the whole batch; ids are sorted so that concurrent
+# flushes lock rows in the same order.
+FLUSH_VIEWS = """
+    UPDATE {post} p
+    SET views = p.views + v.n
+    FROM unnest(%s::bigint[], %s::bigint[]) AS v(id, n)
+    WHERE p.id = v.id
+"""
+
+
+def flush_counts(counts):
+    if not counts:
+        return 0
+    pks = sorted(counts)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            FLUSH_VIEWS.format(post=Post._meta.db_table),
+            [pks, [counts[pk] for pk in pks]],
+        )
+        return cursor.rowcount
+
+
+class LocalViewCounter:
+    # Buffers increments in this process and flushes them from whichever
+    # request finds the flush interval elapsed.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.flushed_at = time.monotonic()
+        atexit.register(self.flush_at_exit)
+
+    def increment(self, pk):
+        now = time.monotonic()
+        with self.lock:
+            self.counts[pk] += 1
+            due = now - self.flushed_at >= settings.BLOG_VIEW_FLUSH_INTERVAL
+            if due:
+                self.flushed_at = now
+        if due:
+            flush_quietly(self)
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+        try:
+            return flush_counts(counts)
+        except Exception:
+            with self.lock:
+                self.counts.update(counts)
+            raise
+
+    def flush_at_exit(self):
+        # Best effort: the database may be gone by the time we shut down.
+        try:
+            self.flush()
+        except DatabaseError:
+            pass
+
+
+class CacheViewCounter:
+    # Buffers increments in a shared cache. Counts are grouped in
+    # generations: each flush starts a new generation and writes the one
+    # before the previous, which no request can still be adding to.
+    timeout = 24 * 60 * 60
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def key(self, generation, name):
+        return f'post-views:{generation}:{name}'
+
+    def generation(self):
+        self.cache.add('post-views:generation', 0, None)
+        return self.cache.get('post-views:generation', 0)
+
+    def increment(self, pk):
+        generation = self.generation()
+        if self.cache.add(self.key(generation, pk), 1, self.timeout):
+            # First view of this post in the generation: list its id.
+            length_key = self.key(generation, 'length')
+            self.cache.add(length_key, 0, self.timeout)
+            slot = self.cache.incr(length_key)
+            self.cache.set(
+                self.key(generation, f'slot-{slot}'), pk, self.timeout
+            )
+        else:
+            try:
+                self.cache.incr(self.key(generation, pk))
+            except ValueError:
+                pass
+
+        # Whichever worker takes the lock flushes for the whole interval.
+        interval = settings.BLOG_VIEW_FLUSH_INTERVAL
+        if self.cache.add('post-views:flush', 1, interval):
+            flush_quietly(self)
+
+    def flush(self):
+        # The generation only moves on once the settled one is written, so
+        # a failed write is retried by the next flush.
+        settled = self.generation() - 1
+        length = self.cache.get(self.key(settled, 'length'), 0)
+        slot_keys = [
+            self.key(settled, f'slot-{slot}') for slot in range(1, length + 1)
+        ]
+        pks = list(self.cache.get_many(slot_keys).values())
+        count_keys = {self.key(settled, pk): pk for pk in pks}
+        counts = {
+            count_keys[key]: count
+            for key, count in self.cache.get_many(count_keys).items()
+        }
+        flushed = flush_counts(counts)
+        self.cache.delete_many(
+            [self.key(settled, 'length'), *slot_keys, *count_keys]
+        )
+        self.cache.incr('post-views:generation')
+        return flushed
+
+
+def flush_quietly(counter):
+    # Flushes from the request path: a failed write keeps its counts for
+    # the next flush and must not fail the request that triggered it.
+    try:
+        counter.flush()
+    except DatabaseError:
+        logger.exception('Flushing post view counts failed.')
+
+
+@cache
+def get_view_counter():
+    return import_string(settings.BLOG_VIEW_COUNTER)()
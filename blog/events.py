@@ -0,0 +1,197 @@
+import asyncio
+import json
+import logging
+import threading
+from functools import cache
+
+import psycopg
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.module_loading import import_string
+from psycopg import sql
+
+from .changes import encode_cursor
+
+logger = logging.getLogger(__name__)
+
+
+def post_event(kind, post, changed_at):
+    # Event ids are change-feed cursors, so a client that reconnects can
+    # catch up from /posts/changes/?since=<last event id>.
+    event = {
+        'type': kind,
+        'id': post.pk,
+        'cursor': encode_cursor(changed_at, post.pk),
+    }
+    if kind != 'delete':
+        event.update(
+            title=post.title,
+            slug=post.slug,
+            author=post.author.username,
+            published_at=post.published_at.isoformat(),
+            updated_at=post.updated_at.isoformat(),
+        )
+    return event
+
+
+class LocalTransport:
+    # Delivers events to broadcasters in this process only. Suitable for
+    # development and single-process deployments.
+    def __init__(self):
+        self.listeners = set()
+        self.lock = threading.Lock()
+
+    def publish(self, event):
+        with self.lock:
+            listeners = list(self.listeners)
+        for loop, dispatch in listeners:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(dispatch, event)
+
+    async def listen(self, dispatch):
+        listener = (asyncio.get_running_loop(), dispatch)
+        with self.lock:
+            self.listeners.add(listener)
+        try:
+            await asyncio.Future()
+        finally:
+            with self.lock:
+                self.listeners.discard(listener)
+
+
+class PostgresTransport:
+    # Fans events out to every worker through LISTEN/NOTIFY. Each worker's
+    # broadcaster holds one listening connection, however many clients it
+    # serves.
+    reconnect_delay = 1
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+        self.channel = settings.BLOG_EVENTS_CHANNEL
+
+    def publish(self, event):
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, %s)', [self.channel, json.dumps(event)]
+            )
+
+    async def listen(self, dispatch):
+        params = connections[self.alias].get_connection_params()
+        params.pop('cursor_factory', None)
+        params.pop('context', None)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    autocommit=True, **params
+                ) as connection:
+                    await connection.execute(
+                        sql.SQL('LISTEN {}').format(
+                            sql.Identifier(self.channel)
+                        )
+                    )
+                    async for notify in connection.notifies():
+                        dispatch(json.loads(notify.payload))
+            except psycopg.OperationalError:
+                await asyncio.sleep(self.reconnect_delay)
+
+
+@cache
+def get_event_transport():
+    return import_string(settings.BLOG_EVENTS_TRANSPORT)()
+
+
+class Broadcaster:
+    def __init__(self, transport):
+        self.transport = transport
+        self.loop = asyncio.get_running_loop()
+        self.subscribers = set()
+        self.listener = None
+
+    def dispatch(self, event):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A subscriber that cannot keep up is dropped; its stream
+                # ends and the client resumes from the change feed.
+                self.subscribers.discard(queue)
+
+    async def subscribe(self, keepalive):
+        # Yields events, or None after `keepalive` seconds without one.
+        queue = asyncio.Queue(settings.BLOG_EVENTS_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if self.listener is None:
+            self.listener = asyncio.create_task(
+                self.transport.listen(self.dispatch)
+            )
+            self.listener.add_done_callback(self.listener_done)
+        try:
+            while queue in self.subscribers or not queue.empty():
+                try:
+                    yield await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self.subscribers.discard(queue)
+            if not self.subscribers and self.listener is not None:
+                self.listener.cancel()
+                self.listener = None
+
+    def listener_done(self, listener):
+        # Transports only return when cancelled; anything else is logged
+        # and the next subscriber starts a new listener.
+        if listener.cancelled():
+            return
+        if self.listener is listener:
+            self.listener = None
+        logger.error(
+            'Event transport stopped listening.',
+            exc_info=listener.exception(),
+        )
+
+
+_broadcaster = None
+
+
+def get_broadcaster():
+    # One broadcaster per worker process and event loop.
+    global _broadcaster
+    if _broadcaster is None or _broadcaster.loop is not (
+        asyncio.get_running_loop()
+    ):
+        _broadcaster = Broadcaster(get_event_transport())
+    return _broadcaster
+
+
+async def stream_events(broadcaster):
+    yield 'retry: 3000\n\n'
+    async for event in broadcaster.subscribe(settings.BLOG_EVENTS_KEEPALIVE):
+        if event is None:
+            yield ': keepalive\n\n'
+        else:
+            yield (
+                f'id: {event["cursor"]}\n'
+                f'event: {event["type"]}\n'
+                f'data: {json.dumps(event)}\n\n'
+            )
+
+
+async def post_events(request):
+    # Only public posts produce events, so the stream needs no
+    # authentication and never touches the database.
+    if not isinstance(request, ASGIRequest):
+        # A WSGI server would buffer the endless stream in memory and tie up
+        # the worker without ever sending a byte.
+        return HttpResponse(
+            'Post events are only served under ASGI.\n',
+            status=501,
+            content_type='text/plain',
+        )
+    response = StreamingHttpResponse(
+        stream_events(get_broadcaster()), content_type='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
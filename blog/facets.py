@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+
+from .models import Post, Tag
+
+User = get_user_model()
+
+# Each facet is a grouped count over the ids matched by the list filters.
+# The requested facets are combined with UNION ALL so that all of them
+# come back from one statement that reads the matched ids once.
+FACET_QUERIES = {
+    'tags': """
+        SELECT 'tags', t.name, count(*) AS n
+        FROM matched m
+        JOIN {post_tags} pt ON pt.post_id = m.id
+        JOIN {tag} t ON t.id = pt.tag_id
+        GROUP BY t.name
+        ORDER BY n DESC, t.name
+        LIMIT %s
+    """,
+    'authors': """
+        SELECT 'authors', u.username, count(*) AS n
+        FROM matched m
+        JOIN {post} p ON p.id = m.id
+        JOIN {user} u ON u.id = p.author_id
+        GROUP BY u.username
+        ORDER BY n DESC, u.username
+        LIMIT %s
+    """,
+    'months': """
+        SELECT
+            'months',
+            to_char(p.published_at AT TIME ZONE %s, 'YYYY-MM') AS month,
+            count(*) AS n
+        FROM matched m
+        JOIN {post} p ON p.id = m.id
+        WHERE p.published_at IS NOT NULL
+        GROUP BY month
+        ORDER BY month DESC
+        LIMIT %s
+    """,
+}
+
+
+def facet_counts(queryset, names):
+    # Returns {name: [{'value': ..., 'count': ...}, ...]} for the posts
+    # matched by `queryset`.
+    matched_sql, params = (
+        queryset.order_by().values('pk').distinct().query.sql_with_params()
+    )
+    tables = {
+        'post': Post._meta.db_table,
+        'post_tags': Post.tags.through._meta.db_table,
+        'tag': Tag._meta.db_table,
+        'user': User._meta.db_table,
+    }
+    params = list(params)
+    branches = []
+    for name in names:
+        branches.append(f'({FACET_QUERIES[name].format(**tables)})')
+        if name == 'months':
+            params.append(settings.TIME_ZONE)
+        params.append(settings.BLOG_FACET_LIMIT)
+
+    sql = (
+        f'WITH matched (id) AS MATERIALIZED ({matched_sql}) '
+        + ' UNION ALL '.join(branches)
+    )
+
+    facets = {name: [] for name in names}
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        for name, value, count in cursor.fetchall():
+            facets[name].append({'value': value, 'count': count})
+    return facets
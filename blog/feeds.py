@@ -0,0 +1,179 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import feedgenerator, timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views import View
+
+from .metrics import get_metrics
+from .models import Post, PostTombstone, Tag
+from .rendering import RENDERER_VERSION, render_markdown
+
+User = get_user_model()
+
+# Anything a feed shows moves one of these: saving or touching a post
+# (updated_at), a scheduled post going live (published_at) or removing a
+# public post (its tombstone). Each is read from an index, and reading them
+# from the database lets writes made by other workers and by management
+# commands retire cached feeds too.
+FEED_VERSION = """
+    SELECT
+        (SELECT max(updated_at) FROM {post}),
+        (SELECT max(published_at) FROM {post} WHERE published_at <= now()),
+        (SELECT max(deleted_at) FROM {tombstone})
+"""
+
+# Cached in place of a feed whose tag or author does not exist.
+NOT_FOUND = 'not-found'
+
+
+def get_feed_version():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            FEED_VERSION.format(
+                post=Post._meta.db_table,
+                tombstone=PostTombstone._meta.db_table,
+            )
+        )
+        row = cursor.fetchone()
+    return hashlib.md5(repr(row).encode()).hexdigest()[:12]
+
+
+class JSONFeed(feedgenerator.SyndicationFeed):
+    # JSON Feed 1.1, https://www.jsonfeed.org/version/1.1/
+    content_type = 'application/feed+json; charset=utf-8'
+
+    def write(self, outfile, encoding):
+        feed = self.feed
+        document = {
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': feed['title'],
+            'home_page_url': feed['link'],
+            'feed_url': feed['feed_url'],
+            'description': feed['description'],
+            'items': [
+                {
+                    'id': item['unique_id'],
+                    'url': item['link'],
+                    'title': item['title'],
+                    'content_html': item['description'],
+                    'date_published': item['pubdate'].isoformat(),
+                    'date_modified': item['updateddate'].isoformat(),
+                    'authors': [{'name': item['author_name']}],
+                    'tags': list(item['categories']),
+                }
+                for item in self.items
+            ],
+        }
+        outfile.write(json.dumps(document, ensure_ascii=False))
+
+
+FEED_FORMATS = {
+    'rss': feedgenerator.Rss201rev2Feed,
+    'atom': feedgenerator.Atom1Feed,
+    'json': JSONFeed,
+}
+
+
+class PostFeed(View):
+    # Feeds are generated once per content change: the body, ETag and
+    # Last-Modified are cached under the feed version, so a poll that finds
+    # nothing new costs one indexed query. An unknown tag or author is
+    # cached as not found the same way.
+    def get(self, request, feed_format='rss', **kwargs):
+        if feed_format not in FEED_FORMATS:
+            raise Http404('Unknown feed format.')
+
+        variant = request.build_absolute_uri(request.path)
+        key = (
+            f'feed:{RENDERER_VERSION}:{get_feed_version()}:'
+            f'{hashlib.md5(variant.encode()).hexdigest()}'
+        )
+        entry = cache.get(key)
+        get_metrics().record_cache('feeds', entry is not None, entry is None)
+        if entry is None:
+            try:
+                entry = self.generate(request, feed_format, **kwargs)
+            except Http404:
+                entry = NOT_FOUND
+            cache.set(key, entry, settings.BLOG_FEED_TIMEOUT)
+        if entry == NOT_FOUND:
+            raise Http404('No such tag or author.')
+        content_type, body, etag, last_modified = entry
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = HttpResponse(body, content_type=content_type)
+        response.headers['ETag'] = etag
+        if last_modified is not None:
+            response.headers['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(
+            response, public=True, max_age=settings.BLOG_FEED_MAX_AGE
+        )
+        return response
+
+    def generate(self, request, feed_format, tag=None, author=None):
+        posts = Post.objects.filter(
+            status='published', published_at__lte=timezone.now()
+        )
+        title = 'Blog posts'
+        if tag is not None:
+            tag = get_object_or_404(Tag, name__iexact=tag)
+            posts = posts.filter(tags=tag)
+            title = f'Blog posts tagged {tag.name}'
+        if author is not None:
+            author = get_object_or_404(User, username__iexact=author)
+            posts = posts.filter(author=author)
+            title = f'Blog posts by {author.username}'
+
+        posts = (
+            posts.select_related('author')
+            .prefetch_related('tags')
+            .order_by('-published_at')[: settings.BLOG_FEED_ITEMS]
+        )
+
+        feed = FEED_FORMATS[feed_format](
+            title=title,
+            link=request.build_absolute_uri(reverse('post-list')),
+            feed_url=request.build_absolute_uri(),
+            description=title,
+            language=settings.LANGUAGE_CODE,
+        )
+        for post in posts:
+            link = request.build_absolute_uri(
+                reverse('post-detail', args=[post.pk])
+            )
+            feed.add_item(
+                title=post.title,
+                link=link,
+                unique_id=link,
+                # Posts imported but not yet re-rendered by render_posts
+                # are rendered here, so the feed does not change when they
+                # are.
+                description=(
+                    post.content_html
+                    if post.content_html_version == RENDERER_VERSION
+                    else render_markdown(post.content)
+                ),
+                author_name=post.author.username,
+                pubdate=post.published_at,
+                updateddate=post.updated_at,
+                categories=[tag.name for tag in post.tags.all()],
+            )
+
+        body = feed.writeString('utf-8').encode()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        last_modified = (
+            int(feed.latest_post_date().timestamp()) if feed.items else None
+        )
+        return feed.content_type, body, etag, last_modified
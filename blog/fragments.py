@@ -0,0 +1,85 @@
+import hashlib
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+from .metrics import get_metrics
+from .models import Post
+from .rendering import RENDERER_VERSION
+
+# Bump whenever PostSerializer output changes so that fragments rendered by
+# the old serializer are no longer read.
+FRAGMENT_VERSION = 1
+
+# Columns a fragment is keyed by, to be read with values_list().
+FRAGMENT_FIELDS = ('pk', 'updated_at', 'views', 'content_html_version')
+
+
+class PostFragments(Sequence):
+    # Pre-rendered JSON for a list of posts. JSON renderers splice `raw` into
+    # the response body; everything else sees the decoded posts.
+    def __init__(self, raw):
+        self.raw = raw
+
+    @cached_property
+    def decoded(self):
+        return [json.loads(fragment) for fragment in self.raw]
+
+    def __getitem__(self, index):
+        return self.decoded[index]
+
+    def __len__(self):
+        return len(self.raw)
+
+
+def fragment_variant(request, serializer_class):
+    # Hyperlinks depend on the host and optional fields on the query string;
+    # the viewer never changes a post's representation.
+    variant = '|'.join(
+        [
+            request.build_absolute_uri('/'),
+            *serializer_class.included_optional_fields(request),
+        ]
+    )
+    return hashlib.md5(variant.encode()).hexdigest()[:12]
+
+
+def fragment_key(pk, updated_at, views, html_version, variant):
+    # View counts are flushed, and content_html filled in by render_posts,
+    # without touching updated_at, so they are part of the key too.
+    return (
+        f'post-fragment:{FRAGMENT_VERSION}:{RENDERER_VERSION}:{variant}:'
+        f'{pk}:{updated_at.timestamp()}:{views}:{html_version}'
+    )
+
+
+def get_post_fragments(rows, serializer_class, context, renderer):
+    # `rows` hold FRAGMENT_FIELDS; only cache misses are serialized.
+    variant = fragment_variant(context['request'], serializer_class)
+    keys = [fragment_key(*row, variant) for row in rows]
+    fragments = cache.get_many(keys)
+
+    missing = {
+        row[0]: key for row, key in zip(rows, keys) if key not in fragments
+    }
+    get_metrics().record_cache('post_fragments', len(fragments), len(missing))
+    if missing:
+        posts = (
+            Post.objects.filter(pk__in=missing)
+            .select_related('author')
+            .prefetch_related('tags')
+        )
+        rendered = {
+            missing[item['id']]: renderer.render(item)
+            for item in serializer_class(
+                posts, many=True, context=context
+            ).data
+        }
+        cache.set_many(rendered, settings.BLOG_POST_FRAGMENT_TIMEOUT)
+        fragments.update(rendered)
+
+    # Posts deleted since the page was fetched are skipped.
+    return PostFragments([fragments[key] for key in keys if key in fragments])
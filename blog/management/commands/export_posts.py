@@ -0,0 +1,78 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# Tags are exported as a JSON array in both formats so that names containing
+# commas survive a CSV round trip.
+EXPORT_QUERY = """
+    SELECT
+        p.title,
+        p.slug,
+        p.content,
+        u.username AS author,
+        p.status,
+        p.published_at,
+        p.created_at,
+        COALESCE(
+            (
+                SELECT json_agg(t.name ORDER BY t.name)
+                FROM blog_post_tags pt
+                JOIN blog_tag t ON t.id = pt.tag_id
+                WHERE pt.post_id = p.id
+            ),
+            '[]'
+        ) AS tags
+    FROM blog_post p
+    JOIN auth_user u ON u.id = p.author_id
+    ORDER BY p.id
+"""
+
+
+class Command(BaseCommand):
+    help = 'Stream every post to JSONL or CSV with COPY ... TO STDOUT.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output', help="Path of the file to write, or '-' for stdout."
+        )
+        parser.add_argument('--format', choices=['jsonl', 'csv'], default=None)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('export_posts requires PostgreSQL.')
+
+        output = options['output']
+        file_format = options['format'] or (
+            'csv' if output.endswith('.csv') else 'jsonl'
+        )
+
+        out = sys.stdout.buffer if output == '-' else open(output, 'wb')
+        try:
+            with connection.cursor() as cursor:
+                if file_format == 'csv':
+                    exported = self.export_csv(cursor, out)
+                else:
+                    exported = self.export_jsonl(cursor, out)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+
+        self.stderr.write(f'Exported {exported} posts.')
+
+    def export_csv(self, cursor, out):
+        sql = f'COPY ({EXPORT_QUERY}) TO STDOUT WITH (FORMAT csv, HEADER)'
+        with cursor.copy(sql) as copy:
+            for block in copy:
+                out.write(block)
+        return cursor.rowcount
+
+    def export_jsonl(self, cursor, out):
+        sql = f'COPY (SELECT row_to_json(p) FROM ({EXPORT_QUERY}) p) TO STDOUT'
+        exported = 0
+        with cursor.copy(sql) as copy:
+            for (line,) in copy.rows():
+                out.write(line.encode())
+                out.write(b'\n')
+                exported += 1
+        return exported
@@ -0,0 +1,386 @@
+import csv
+import json
+import re
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.text import slugify
+
+from blog.bulk import batched, copy_rows
+
+STAGING_COLUMNS = [
+    'seq',
+    'title',
+    'slug',
+    'content',
+    'author',
+    'status',
+    'published_at',
+    'created_at',
+    'tags',
+    'slug_derived',
+]
+
+CREATE_STAGING = """
+    CREATE UNLOGGED TABLE IF NOT EXISTS {staging} (
+        seq bigint PRIMARY KEY,
+        title text,
+        slug text,
+        content text,
+        author text,
+        status text,
+        published_at timestamptz,
+        created_at timestamptz,
+        tags jsonb,
+        slug_derived boolean NOT NULL DEFAULT false
+    )
+"""
+
+CREATE_SLUG_INDEX = """
+    CREATE INDEX IF NOT EXISTS {staging}_slug ON {staging} (slug)
+"""
+
+CREATE_AUTHORS = """
+    INSERT INTO auth_user (
+        password, is_superuser, username, first_name, last_name, email,
+        is_staff, is_active, date_joined
+    )
+    SELECT %s, false, s.author, '', '', '', false, true, now()
+    FROM (SELECT DISTINCT author FROM {staging}) s
+    ON CONFLICT (username) DO NOTHING
+"""
+
+MISSING_AUTHORS = """
+    SELECT DISTINCT s.author
+    FROM {staging} s
+    LEFT JOIN auth_user u ON u.username = s.author
+    WHERE u.id IS NULL
+    ORDER BY 1
+    LIMIT 5
+"""
+
+# Tag names match case-insensitively, as in the API; a new tag is created
+# with the spelling it is first staged with.
+CREATE_TAGS = """
+    INSERT INTO blog_tag (name)
+    SELECT DISTINCT ON (lower(n.name)) n.name
+    FROM {staging} s
+    CROSS JOIN LATERAL jsonb_array_elements_text(s.tags) n(name)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM blog_tag t WHERE lower(t.name) = lower(n.name)
+    )
+    ORDER BY lower(n.name), s.seq
+    ON CONFLICT (name) DO NOTHING
+"""
+
+RENAME_SLUGS = """
+    UPDATE {staging} s
+    SET slug = left(s.slug, 180) || '-' || s.seq
+    FROM (
+        SELECT seq, slug, row_number() OVER (PARTITION BY slug ORDER BY seq) n
+        FROM {staging}
+    ) d
+    WHERE d.seq = s.seq
+      AND (
+        d.n > 1
+        OR EXISTS (SELECT 1 FROM blog_post p WHERE p.slug = d.slug)
+      )
+    RETURNING s.seq
+"""
+
+# A slug derived from a title only names an existing post or another
+# record's slug by accident, so it gets a suffix instead of updating that
+# post or record. Only explicit slugs update existing posts. Of several
+# records deriving one new slug, the first keeps it unless a record gives
+# it explicitly.
+SUFFIX_DERIVED_SLUGS = """
+    UPDATE {staging} s
+    SET slug = left(s.slug, 180) || '-' || s.seq
+    FROM (
+        SELECT seq, slug, row_number() OVER (
+            PARTITION BY slug ORDER BY slug_derived, seq
+        ) n
+        FROM {staging}
+    ) d
+    WHERE d.seq = s.seq
+      AND s.slug_derived
+      AND (
+        d.n > 1
+        OR EXISTS (SELECT 1 FROM blog_post p WHERE p.slug = d.slug)
+      )
+    RETURNING s.seq
+"""
+
+# A suffixed slug can itself be taken, by a post or another record; such
+# slugs are suffixed again (with a counter, so truncation cannot repeat a
+# slug) until none is.
+RESUFFIX_SLUGS = """
+    UPDATE {staging} s
+    SET slug = left(s.slug, 170) || '-' || s.seq || '-' || %(attempt)s
+    WHERE s.seq = ANY(%(seqs)s)
+      AND (
+        EXISTS (SELECT 1 FROM blog_post p WHERE p.slug = s.slug)
+        OR EXISTS (
+            SELECT 1 FROM {staging} d WHERE d.slug = s.slug AND d.seq <> s.seq
+        )
+      )
+    RETURNING s.seq
+"""
+
+MAX_SUFFIX_ATTEMPTS = 10
+
+# The last record for a slug wins, as if the records were replayed in order.
+DEDUPLICATE_SLUGS = """
+    DELETE FROM {staging} s
+    USING {staging} d
+    WHERE d.slug = s.slug AND d.seq > s.seq
+"""
+
+UPDATE_POSTS = """
+    UPDATE blog_post p
+    SET title = s.title,
+        content = s.content,
+        content_html = CASE
+            WHEN p.content = s.content THEN p.content_html ELSE ''
+        END,
+        content_html_version = CASE
+            WHEN p.content = s.content THEN p.content_html_version ELSE 0
+        END,
+        author_id = u.id,
+        status = s.status,
+        published_at = s.published_at,
+        updated_at = now()
+    FROM {staging} s
+    JOIN auth_user u ON u.username = s.author
+    WHERE p.slug = s.slug
+"""
+
+INSERT_POSTS = """
+    INSERT INTO blog_post (
+        title, slug, content, content_html, content_html_version, author_id,
+        published_at, status, created_at, updated_at, views
+    )
+    SELECT
+        s.title, s.slug, s.content, '', 0, u.id, s.published_at, s.status,
+        COALESCE(s.created_at, now()), now(), 0
+    FROM {staging} s
+    JOIN auth_user u ON u.username = s.author
+    WHERE NOT EXISTS (SELECT 1 FROM blog_post p WHERE p.slug = s.slug)
+"""
+
+UNLINK_TAGS = """
+    DELETE FROM blog_post_tags pt
+    USING blog_post p, {staging} s
+    WHERE p.slug = s.slug AND pt.post_id = p.id
+"""
+
+LINK_TAGS = """
+    INSERT INTO blog_post_tags (post_id, tag_id)
+    SELECT DISTINCT p.id, t.id
+    FROM {staging} s
+    JOIN blog_post p ON p.slug = s.slug
+    CROSS JOIN LATERAL jsonb_array_elements_text(s.tags) n(name)
+    JOIN blog_tag t ON lower(t.name) = lower(n.name)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Import posts from JSONL or CSV (as written by export_posts). '
+        'Records are streamed into an unlogged staging table with COPY in '
+        'resumable batches, then merged into the blog tables with set-based '
+        'SQL in a single transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input', help="Path of the file to read, or '-' for stdin."
+        )
+        parser.add_argument('--format', choices=['jsonl', 'csv'], default=None)
+        parser.add_argument(
+            '--job',
+            default=None,
+            help=(
+                'Name of the import job, defaulting to the file name. '
+                'Re-running an interrupted job resumes after the last '
+                'staged batch.'
+            ),
+        )
+        parser.add_argument('--batch-size', type=int, default=50_000)
+        parser.add_argument(
+            '--on-conflict',
+            choices=['update', 'rename'],
+            default='update',
+            help=(
+                'What to do with a post whose slug already exists: update '
+                'the existing post, or import it under a suffixed slug.'
+            ),
+        )
+        parser.add_argument(
+            '--create-authors',
+            action='store_true',
+            help='Create users for unknown authors instead of failing.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('import_posts requires PostgreSQL.')
+
+        path = options['input']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        job = options['job'] or ('stdin' if path == '-' else Path(path).stem)
+        self.staging = 'blog_import_' + re.sub(r'\W', '_', job.lower())[:40]
+
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_STAGING.format(staging=self.staging))
+            cursor.execute(f'SELECT COALESCE(max(seq), 0) FROM {self.staging}')
+            (staged,) = cursor.fetchone()
+
+        if staged:
+            self.stdout.write(f'Resuming job {job!r} after record {staged}.')
+
+        # stdin is read but left open for the caller.
+        opened = (
+            nullcontext(sys.stdin) if path == '-' else open(path, newline='')
+        )
+        with opened as source:
+            records = self.read(source, file_format, staged)
+            for batch in batched(records, options['batch_size']):
+                rows = [self.staging_row(seq, record) for seq, record in batch]
+                with transaction.atomic(), connection.cursor() as cursor:
+                    copy_rows(cursor, self.staging, STAGING_COLUMNS, rows)
+                staged = batch[-1][0]
+                self.stdout.write(f'Staged {staged} records.')
+
+        self.merge(options)
+
+    def read(self, source, file_format, staged):
+        if file_format == 'csv':
+            records = csv.DictReader(source)
+        else:
+            records = (line for line in source if line.strip())
+
+        # Records that are already staged are skipped without being parsed.
+        for seq, record in enumerate(records, start=1):
+            if seq <= staged:
+                continue
+            if file_format == 'jsonl':
+                try:
+                    record = json.loads(record)
+                except ValueError as exc:
+                    raise CommandError(f'Record {seq}: {exc}.')
+            yield seq, record
+
+    def staging_row(self, seq, record):
+        try:
+            title = record['title']
+            content = record['content']
+            author = record['author']
+        except KeyError as exc:
+            raise CommandError(f'Record {seq}: missing field {exc}.')
+
+        status = record.get('status') or 'draft'
+        published_at = record.get('published_at') or None
+        if status not in ('draft', 'published'):
+            raise CommandError(f'Record {seq}: unknown status {status!r}.')
+        if status == 'published' and published_at is None:
+            raise CommandError(
+                f'Record {seq}: published posts must have published_at.'
+            )
+        if status == 'draft' and published_at is not None:
+            raise CommandError(
+                f'Record {seq}: drafts cannot have published_at.'
+            )
+
+        tags = record.get('tags') or []
+        if isinstance(tags, str):
+            try:
+                tags = json.loads(tags)
+            except ValueError as exc:
+                raise CommandError(f'Record {seq}: invalid tags: {exc}.')
+        if not isinstance(tags, list) or not all(
+            isinstance(tag, str) for tag in tags
+        ):
+            raise CommandError(
+                f'Record {seq}: tags must be a list of tag names.'
+            )
+
+        slug = record.get('slug')
+        return (
+            seq,
+            title,
+            slug or slugify(title),
+            content,
+            author,
+            status,
+            published_at,
+            record.get('created_at') or None,
+            json.dumps(tags),
+            not slug,
+        )
+
+    def merge(self, options):
+        def execute(sql, params=None):
+            cursor.execute(sql.format(staging=self.staging), params)
+            return cursor.rowcount
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            execute(CREATE_SLUG_INDEX)
+
+            if options['create_authors']:
+                created = execute(CREATE_AUTHORS, [make_password(None)])
+                self.stdout.write(f'Created {created} authors.')
+            else:
+                execute(MISSING_AUTHORS)
+                if missing := [author for (author,) in cursor.fetchall()]:
+                    raise CommandError(
+                        f'Unknown authors: {", ".join(missing)}. Pass '
+                        '--create-authors to create them; staged records '
+                        'are kept for the next run.'
+                    )
+
+            self.stdout.write(f'Created {execute(CREATE_TAGS)} tags.')
+
+            if options['on_conflict'] == 'rename':
+                renamed = self.suffix_slugs(execute, cursor, RENAME_SLUGS)
+                self.stdout.write(f'Renamed {renamed} slugs.')
+            else:
+                suffixed = self.suffix_slugs(
+                    execute, cursor, SUFFIX_DERIVED_SLUGS
+                )
+                self.stdout.write(f'Suffixed {suffixed} derived slugs.')
+                execute(DEDUPLICATE_SLUGS)
+                self.stdout.write(f'Updated {execute(UPDATE_POSTS)} posts.')
+
+            self.stdout.write(f'Inserted {execute(INSERT_POSTS)} posts.')
+
+            execute(UNLINK_TAGS)
+            self.stdout.write(f'Linked {execute(LINK_TAGS)} tags.')
+
+            execute('DROP TABLE {staging}')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                'Import merged. Run render_posts to fill content_html and '
+                'rebuild_related to refresh related posts.'
+            )
+        )
+
+    def suffix_slugs(self, execute, cursor, sql):
+        execute(sql)
+        seqs = [seq for (seq,) in cursor.fetchall()]
+        pending = seqs
+        for attempt in range(2, MAX_SUFFIX_ATTEMPTS + 2):
+            if not pending:
+                return len(seqs)
+            execute(RESUFFIX_SLUGS, {'seqs': pending, 'attempt': attempt})
+            pending = [seq for (seq,) in cursor.fetchall()]
+        raise CommandError(
+            f'Record {min(pending)}: no free slug found; give it a slug.'
+        )
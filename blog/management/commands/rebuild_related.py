@@ -0,0 +1,77 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import Max, Min
+
+from blog.models import Post, RelatedPost
+from blog.related import rebuild_related
+
+
+def rebuild_batch(ids):
+    with transaction.atomic():
+        return rebuild_related(ids)
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the precomputed related-post lists of every post, spreading '
+        'id ranges across a process pool.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1_000)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help=(
+                'Number of processes, each with its own connection '
+                '(1 rebuilds inline).'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        if connection.vendor != 'postgresql':
+            raise CommandError('rebuild_related requires PostgreSQL.')
+
+        bounds = Post.objects.aggregate(first=Min('pk'), last=Max('pk'))
+        if bounds['first'] is None:
+            RelatedPost.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS('No posts to relate.'))
+            return
+
+        batch_size = options['batch_size']
+        batches = (
+            range(start, min(start + batch_size, bounds['last'] + 1))
+            for start in range(bounds['first'], bounds['last'] + 1, batch_size)
+        )
+
+        if options['workers'] == 1:
+            stored = self.report(map(rebuild_batch, batches))
+        else:
+            # Workers open their own connections; an inherited socket must
+            # not be shared with the parent.
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options['workers'], initializer=django.setup
+            ) as executor:
+                stored = self.report(executor.map(rebuild_batch, batches))
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {RelatedPost._meta.db_table}')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Stored {stored} related-post links.')
+        )
+
+    def report(self, results):
+        stored = 0
+        for batch, count in enumerate(results, start=1):
+            stored += count
+            if self.verbosity > 1:
+                self.stdout.write(f'Rebuilt {batch} batches.')
+        return stored
@@ -0,0 +1,92 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.rendering import RENDERER_VERSION, render_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-render the stored HTML of posts whose renderer version is out of '
+        'date, spreading the work across a process pool.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-render every post, not only the outdated ones.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Number of rendering processes (1 renders inline).',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        queryset = Post.objects.all()
+        if not options['all']:
+            queryset = queryset.exclude(content_html_version=RENDERER_VERSION)
+
+        batches = self.batches(queryset, options['batch_size'])
+        workers = options['workers']
+
+        rendered = 0
+        if workers == 1:
+            for batch in batches:
+                rendered += self.store(render_batch(batch))
+        else:
+            # Workers only render; the parent owns the database connection.
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = set()
+                for batch in batches:
+                    pending.add(executor.submit(render_batch, batch))
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(
+                            pending, return_when=FIRST_COMPLETED
+                        )
+                        for future in done:
+                            rendered += self.store(future.result())
+                for future in pending:
+                    rendered += self.store(future.result())
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rendered {rendered} posts with renderer version '
+                f'{RENDERER_VERSION}.'
+            )
+        )
+
+    def batches(self, queryset, batch_size):
+        last_pk = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', 'content')[:batch_size]
+            )
+            if not batch:
+                return
+            last_pk = batch[-1][0]
+            yield batch
+
+    def store(self, rendered):
+        Post.objects.bulk_update(
+            [
+                Post(
+                    pk=pk,
+                    content_html=html,
+                    content_html_version=RENDERER_VERSION,
+                )
+                for pk, html in rendered
+            ],
+            ['content_html', 'content_html_version'],
+        )
+        if self.verbosity > 1:
+            self.stdout.write(f'Rendered posts up to id {rendered[-1][0]}.')
+        return len(rendered)
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog.tasks import run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Run deferred tasks queued by post and tag writes. Several workers '
+        'can run side by side; each claims its own batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no task is due instead of polling for more.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('run_tasks requires PostgreSQL.')
+
+        total = 0
+        try:
+            while True:
+                claimed = run_pending(options['batch_size'])
+                total += claimed
+                if claimed and options['verbosity'] > 1:
+                    self.stdout.write(f'Ran {claimed} tasks.')
+                if not claimed:
+                    if options['once']:
+                        break
+                    time.sleep(settings.BLOG_TASK_POLL_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {total} tasks.'))
@@ -0,0 +1,276 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from itertools import accumulate
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from blog.bulk import batched, copy_rows, reserve_ids
+from blog.models import Post, Tag
+
+User = get_user_model()
+
+WORDS = (
+    'api async benchmark cache django database deploy index latency model '
+    'postgres python query queue request scale schema serializer server '
+    'shard signal sql stream test thread throughput token view worker'
+).split()
+
+POST_COLUMNS = [
+    'id',
+    'title',
+    'slug',
+    'content',
+    'content_html',
+    'content_html_version',
+    'author_id',
+    'published_at',
+    'status',
+    'created_at',
+    'updated_at',
+    'views',
+]
+
+
+def zipf_weights(count, skew):
+    return list(accumulate(1 / rank**skew for rank in range(1, count + 1)))
+
+
+class PostGenerator:
+    def __init__(self, user_ids, tag_ids, now, options):
+        self.user_ids = user_ids
+        self.tag_ids = tag_ids
+        self.now = now
+        self.seed = options['seed']
+        self.draft_ratio = options['draft_ratio']
+        self.spread = timedelta(days=options['days']).total_seconds()
+        self.max_tags = min(options['max_tags_per_post'], len(tag_ids))
+        self.author_weights = zipf_weights(
+            len(user_ids), options['author_skew']
+        )
+        self.tag_weights = zipf_weights(len(tag_ids), options['tag_skew'])
+
+    def load(self, ids):
+        # Seeding each batch from its first id keeps a seeded run
+        # reproducible however the batches are spread over workers.
+        seed = None if self.seed is None else f'{self.seed}:{ids.start}'
+        self.rng = random.Random(seed)
+
+        links = []
+        for pk in ids:
+            if tags_per_post := self.rng.randint(0, self.max_tags):
+                tags = self.rng.choices(
+                    self.tag_ids, cum_weights=self.tag_weights, k=tags_per_post
+                )
+                links.extend((pk, tag_id) for tag_id in set(tags))
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            copy_rows(
+                cursor,
+                Post._meta.db_table,
+                POST_COLUMNS,
+                map(self.post_row, ids),
+            )
+            copy_rows(
+                cursor,
+                Post.tags.through._meta.db_table,
+                ['post_id', 'tag_id'],
+                links,
+            )
+        return len(ids)
+
+    def post_row(self, pk):
+        rng = self.rng
+        created_at = self.now - timedelta(seconds=rng.random() * self.spread)
+        if rng.random() < self.draft_ratio:
+            status, published_at = 'draft', None
+        else:
+            status, published_at = 'published', created_at
+
+        title = ' '.join(rng.choices(WORDS, k=6)).capitalize()
+        content = ' '.join(rng.choices(WORDS, k=rng.randint(50, 300)))
+        (author_id,) = rng.choices(
+            self.user_ids, cum_weights=self.author_weights
+        )
+        return (
+            pk,
+            title,
+            f'seed-post-{pk}',
+            content,
+            '',
+            0,
+            author_id,
+            published_at,
+            status,
+            created_at,
+            created_at,
+            0,
+        )
+
+
+_generator = None
+
+
+def init_worker(generator):
+    global _generator
+    django.setup()
+    _generator = generator
+
+
+def load_batch(ids):
+    return _generator.load(ids)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a synthetic dataset of users, tags, posts and tag links '
+        'and load it with COPY.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000)
+        parser.add_argument('--tags', type=int, default=500)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument(
+            '--max-tags-per-post',
+            type=int,
+            default=5,
+            help='Each post gets between 0 and this many tags.',
+        )
+        parser.add_argument(
+            '--tag-skew',
+            type=float,
+            default=1.1,
+            help='Zipf exponent of tag popularity (0 is uniform).',
+        )
+        parser.add_argument(
+            '--author-skew',
+            type=float,
+            default=0.8,
+            help='Zipf exponent of posts per author (0 is uniform).',
+        )
+        parser.add_argument('--draft-ratio', type=float, default=0.1)
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=3 * 365,
+            help='Spread publication dates over this many past days.',
+        )
+        parser.add_argument('--batch-size', type=int, default=20_000)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help=(
+                'Number of loading processes, each with its own connection '
+                '(1 loads inline). Maintaining the full-text index dominates '
+                'load time, so throughput scales with workers.'
+            ),
+        )
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('seed_blog requires PostgreSQL.')
+        if options['users'] < 1 and options['posts'] > 0:
+            raise CommandError('Posts need at least one user.')
+
+        now = timezone.now()
+        with transaction.atomic(), connection.cursor() as cursor:
+            user_ids = self.seed_users(cursor, options['users'], now)
+            tag_ids = self.seed_tags(cursor, options['tags'])
+            post_ids = reserve_ids(
+                cursor, Post._meta.db_table, options['posts']
+            )
+
+        generator = PostGenerator(user_ids, tag_ids, now, options)
+        batches = (
+            range(batch[0], batch[-1] + 1)
+            for batch in batched(post_ids, options['batch_size'])
+        )
+        if options['workers'] == 1:
+            self.report(map(generator.load, batches), len(post_ids), options)
+        else:
+            # Workers open their own connections; an inherited socket must
+            # not be shared with the parent.
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options['workers'],
+                initializer=init_worker,
+                initargs=(generator,),
+            ) as executor:
+                self.report(
+                    executor.map(load_batch, batches),
+                    len(post_ids),
+                    options,
+                )
+
+        with connection.cursor() as cursor:
+            for model in (User, Tag, Post, Post.tags.through):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Seeded {len(user_ids)} users, {len(tag_ids)} tags and '
+                f'{len(post_ids)} posts. Run render_posts to fill '
+                'content_html and rebuild_related to build related posts.'
+            )
+        )
+
+    def report(self, results, total, options):
+        loaded = 0
+        for count in results:
+            loaded += count
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Loaded {loaded}/{total} posts.')
+
+    def seed_users(self, cursor, count, now):
+        table = User._meta.db_table
+        ids = reserve_ids(cursor, table, count)
+        password = make_password(None)
+        copy_rows(
+            cursor,
+            table,
+            [
+                'id',
+                'password',
+                'is_superuser',
+                'username',
+                'first_name',
+                'last_name',
+                'email',
+                'is_staff',
+                'is_active',
+                'date_joined',
+            ],
+            (
+                (
+                    pk,
+                    password,
+                    False,
+                    f'seed-user-{pk}',
+                    '',
+                    '',
+                    f'seed-user-{pk}@example.com',
+                    False,
+                    True,
+                    now,
+                )
+                for pk in ids
+            ),
+        )
+        return ids
+
+    def seed_tags(self, cursor, count):
+        table = Tag._meta.db_table
+        ids = reserve_ids(cursor, table, count)
+        copy_rows(
+            cursor, table, ['id', 'name'], ((pk, f'tag-{pk}') for pk in ids)
+        )
+        return ids
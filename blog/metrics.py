@@ -0,0 +1,475 @@
+import atexit
+import fcntl
+import ipaddress
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from functools import cache
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.utils.module_loading import import_string
+
+# Upper bounds of the latency histogram buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Per (view, method, status): a count per bucket (the last one is +Inf),
+# then the latency sum, query count and query time.
+SUM, QUERIES, QUERY_TIME = range(len(BUCKETS) + 1, len(BUCKETS) + 4)
+
+POOL_GAUGES = {
+    'pool_size': 'Connections currently managed by the pool.',
+    'pool_available': 'Idle connections in the pool.',
+    'pool_max': 'Maximum size of the pool.',
+    'requests_waiting': 'Requests waiting for a connection.',
+}
+
+SNAPSHOT_PREFIX = 'blog-metrics-'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _Shard:
+    # Written only by the thread that owns it, so recording takes no lock;
+    # collect() copies the dicts, which is atomic under the GIL.
+    __slots__ = ('requests', 'caches')
+
+    def __init__(self):
+        self.requests = {}
+        self.caches = {}
+
+
+class LocalMetrics:
+    # Aggregates the metrics of this process only. Shards of threads that
+    # have exited are folded into `retired` when a shard is added or the
+    # metrics are read, so the list only holds live threads.
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.shards = []
+        self.retired = _Shard()
+
+    def shard(self):
+        try:
+            return self.local.shard
+        except AttributeError:
+            shard = self.local.shard = _Shard()
+            thread = weakref.ref(threading.current_thread())
+            with self.lock:
+                self.fold_dead_shards()
+                self.shards.append((thread, shard))
+            return shard
+
+    def fold_dead_shards(self):
+        # Called with the lock held; a dead thread no longer writes its
+        # shard, so it can be merged without copying.
+        live = []
+        for thread, shard in self.shards:
+            owner = thread()
+            if owner is not None and owner.is_alive():
+                live.append((thread, shard))
+            else:
+                merge(self.retired.requests, shard.requests.items())
+                merge(self.retired.caches, shard.caches.items())
+        self.shards = live
+
+    def record_request(self, view, method, status, seconds, queries, q_time):
+        requests = self.shard().requests
+        key = (view, method, status)
+        stats = requests.get(key)
+        if stats is None:
+            stats = requests[key] = [0] * (QUERY_TIME + 1)
+        stats[bisect_left(BUCKETS, seconds)] += 1
+        stats[SUM] += seconds
+        stats[QUERIES] += queries
+        stats[QUERY_TIME] += q_time
+
+    def record_cache(self, name, hits, misses):
+        caches = self.shard().caches
+        stats = caches.get(name)
+        if stats is None:
+            stats = caches[name] = [0, 0]
+        stats[0] += hits
+        stats[1] += misses
+
+    def snapshot(self):
+        requests, caches = {}, {}
+        with self.lock:
+            self.fold_dead_shards()
+            shards = [shard for thread, shard in self.shards]
+            merge(requests, self.retired.requests.items())
+            merge(caches, self.retired.caches.items())
+        for shard in shards:
+            merge(requests, shard.requests.copy().items())
+            merge(caches, shard.caches.copy().items())
+        return {'requests': requests, 'caches': caches, 'pools': pool_stats()}
+
+    def collect(self):
+        return self.snapshot()
+
+
+class FileMetrics(LocalMetrics):
+    # Each process writes its snapshot to BLOG_METRICS_DIR at most every
+    # BLOG_METRICS_WRITE_INTERVAL seconds, and a scrape served by any
+    # process adds up all of them. The snapshot of an exited process is
+    # folded into the retired totals and removed, under a lock on the
+    # directory, so counters never go backwards and a reused pid starts
+    # from nothing; only the pool gauges of exited processes are dropped.
+    def __init__(self, directory=None):
+        super().__init__()
+        directory = directory or settings.BLOG_METRICS_DIR
+        if not directory:
+            raise ImproperlyConfigured(
+                'FileMetrics needs BLOG_METRICS_DIR to be set.'
+            )
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.write_lock = threading.Lock()
+        self.written_at = time.monotonic()
+        # A snapshot under our pid was left by an exited process.
+        with self.locked():
+            self.retire(self.path(os.getpid()))
+        atexit.register(self.write_at_exit)
+
+    def record_request(self, *args):
+        super().record_request(*args)
+        interval = settings.BLOG_METRICS_WRITE_INTERVAL
+        if time.monotonic() - self.written_at >= interval:
+            # Whichever thread gets the lock writes; the others move on.
+            if self.write_lock.acquire(blocking=False):
+                try:
+                    self.write()
+                finally:
+                    self.write_lock.release()
+
+    def path(self, pid):
+        return self.directory / f'{SNAPSHOT_PREFIX}{pid}.json'
+
+    @property
+    def retired_path(self):
+        return self.directory / f'{SNAPSHOT_PREFIX}retired.json'
+
+    @contextmanager
+    def locked(self):
+        with open(self.directory / 'blog-metrics.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def write(self):
+        self.written_at = time.monotonic()
+        write_snapshot(self.path(os.getpid()), self.snapshot())
+
+    def write_at_exit(self):
+        try:
+            self.write()
+        except OSError:
+            pass
+
+    def retire(self, path):
+        # Called with the directory locked.
+        snapshot = read_snapshot(path)
+        if snapshot is not None:
+            retired = read_snapshot(self.retired_path) or {
+                'requests': {},
+                'caches': {},
+            }
+            merge(retired['requests'], snapshot['requests'].items())
+            merge(retired['caches'], snapshot['caches'].items())
+            retired['pools'] = {}
+            write_snapshot(self.retired_path, retired)
+        path.unlink(missing_ok=True)
+
+    def collect(self):
+        collected = self.snapshot()
+        own = str(os.getpid())
+        pattern = f'{SNAPSHOT_PREFIX}*.json'
+        with self.locked():
+            for path in list(self.directory.glob(pattern)):
+                pid = path.stem.removeprefix(SNAPSHOT_PREFIX)
+                if pid.isdecimal() and not process_alive(int(pid)):
+                    self.retire(path)
+            for path in self.directory.glob(pattern):
+                pid = path.stem.removeprefix(SNAPSHOT_PREFIX)
+                snapshot = read_snapshot(path)
+                if pid == own or snapshot is None:
+                    continue
+                merge(collected['requests'], snapshot['requests'].items())
+                merge(collected['caches'], snapshot['caches'].items())
+                merge(collected['pools'], snapshot['pools'].items())
+        return collected
+
+
+def write_snapshot(path, snapshot):
+    temp = path.with_suffix('.tmp')
+    temp.write_text(
+        json.dumps(
+            {
+                'requests': [
+                    [*key, *stats]
+                    for key, stats in snapshot['requests'].items()
+                ],
+                'caches': [
+                    [name, *stats]
+                    for name, stats in snapshot['caches'].items()
+                ],
+                'pools': snapshot['pools'],
+            }
+        )
+    )
+    os.replace(temp, path)
+
+
+def read_snapshot(path):
+    # Returns None for a file that is missing or not a snapshot.
+    try:
+        data = json.loads(path.read_text())
+        return {
+            'requests': {tuple(row[:3]): row[3:] for row in data['requests']},
+            'caches': {row[0]: row[1:] for row in data['caches']},
+            'pools': dict(data['pools']),
+        }
+    except (OSError, ValueError, TypeError, KeyError, IndexError):
+        return None
+
+
+def merge(totals, items):
+    for key, stats in items:
+        if isinstance(stats, dict):
+            into = totals.setdefault(key, {})
+            for name, value in stats.items():
+                into[name] = into.get(name, 0) + value
+        elif key in totals:
+            totals[key] = [a + b for a, b in zip(totals[key], stats)]
+        else:
+            totals[key] = list(stats)
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def pool_stats():
+    stats = {}
+    for connection in connections.all():
+        pool = getattr(connection, 'pool', None)
+        if pool is not None:
+            measures = pool.get_stats()
+            stats[connection.alias] = {
+                name: measures.get(name, 0) for name in POOL_GAUGES
+            }
+    return stats
+
+
+@cache
+def get_metrics():
+    return import_string(settings.BLOG_METRICS)()
+
+
+class QueryTimer:
+    # Installed with connection.execute_wrapper() for one request.
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += time.perf_counter() - start
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unmatched>'
+    view_class = getattr(match.func, 'view_class', None)
+    return (view_class or match.func).__name__
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with self.timing_queries(timer):
+            response = self.get_response(request)
+        self.record(request, response, start, timer)
+        return response
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with self.timing_queries(timer):
+            response = await self.get_response(request)
+        self.record(request, response, start, timer)
+        return response
+
+    def timing_queries(self, timer):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+        return stack
+
+    def record(self, request, response, start, timer):
+        get_metrics().record_request(
+            view_name(request),
+            request.method,
+            str(response.status_code),
+            time.perf_counter() - start,
+            timer.queries,
+            timer.seconds,
+        )
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace('\\', r'\\')
+        .replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def labels(**values):
+    pairs = ','.join(f'{k}="{escape(v)}"' for k, v in values.items())
+    return '{' + pairs + '}'
+
+
+def exposition(collected):
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    requests = sorted(collected['requests'].items())
+    family(
+        'blog_http_request_duration_seconds',
+        'histogram',
+        'Time spent serving requests, by view.',
+    )
+    for (view, method, status), stats in requests:
+        cumulative = 0
+        for bound, count in zip([*BUCKETS, '+Inf'], stats):
+            cumulative += count
+            lines.append(
+                'blog_http_request_duration_seconds_bucket'
+                + labels(view=view, method=method, status=status, le=bound)
+                + f' {cumulative}'
+            )
+        common = labels(view=view, method=method, status=status)
+        lines.append(
+            f'blog_http_request_duration_seconds_sum{common} {stats[SUM]}'
+        )
+        lines.append(
+            f'blog_http_request_duration_seconds_count{common} {cumulative}'
+        )
+
+    family(
+        'blog_db_queries_total',
+        'counter',
+        'Database queries run while serving requests, by view.',
+    )
+    for (view, method, status), stats in requests:
+        common = labels(view=view, method=method, status=status)
+        lines.append(f'blog_db_queries_total{common} {stats[QUERIES]}')
+
+    family(
+        'blog_db_query_duration_seconds_total',
+        'counter',
+        'Time spent in database queries while serving requests, by view.',
+    )
+    for (view, method, status), stats in requests:
+        common = labels(view=view, method=method, status=status)
+        lines.append(
+            f'blog_db_query_duration_seconds_total{common} {stats[QUERY_TIME]}'
+        )
+
+    caches = sorted(collected['caches'].items())
+    family(
+        'blog_cache_requests_total',
+        'counter',
+        'Lookups in the application caches, by cache and result.',
+    )
+    for name, (hits, misses) in caches:
+        lines.append(
+            'blog_cache_requests_total'
+            f'{labels(cache=name, result="hit")} {hits}'
+        )
+        lines.append(
+            'blog_cache_requests_total'
+            f'{labels(cache=name, result="miss")} {misses}'
+        )
+    family(
+        'blog_cache_hit_ratio',
+        'gauge',
+        'Share of lookups in the application caches that were hits.',
+    )
+    for name, (hits, misses) in caches:
+        if hits + misses:
+            ratio = hits / (hits + misses)
+            lines.append(f'blog_cache_hit_ratio{labels(cache=name)} {ratio}')
+
+    pools = sorted(collected['pools'].items())
+    for gauge, help_text in POOL_GAUGES.items():
+        family(f'blog_db_{gauge}', 'gauge', help_text)
+        for alias, stats in pools:
+            lines.append(
+                f'blog_db_{gauge}{labels(alias=alias)} {stats[gauge]}'
+            )
+
+    return '\n'.join(lines) + '\n'
+
+
+def is_local_request(request):
+    # A request forwarded by a proxy on this host also comes from loopback,
+    # so only requests that were not forwarded count as local.
+    if 'X-Forwarded-For' in request.headers or 'Forwarded' in request.headers:
+        return False
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return address.is_loopback
+
+
+def metrics(request):
+    token = settings.BLOG_METRICS_TOKEN
+    if token:
+        if not constant_time_compare(
+            request.headers.get('Authorization', ''), f'Bearer {token}'
+        ):
+            return HttpResponse(
+                status=401, headers={'WWW-Authenticate': 'Bearer'}
+            )
+    elif not (request.user.is_staff or is_local_request(request)):
+        return HttpResponse(status=403)
+    return HttpResponse(
+        exposition(get_metrics().collect()), content_type=CONTENT_TYPE
+    )
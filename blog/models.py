@@ -1,11 +1,17 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 from django.utils.text import slugify
 
+from .rendering import RENDERER_VERSION, render_markdown
+
 User = get_user_model()
 
+SEARCH_VECTOR = SearchVector('title', 'content', config='english')
+
 
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -17,6 +23,61 @@ class Tag(models.Model):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+    # A segmented queryset reads its rows from each segment in turn, each in
+    # the queryset's own ordering, instead of sorting the whole set by the
+    # segment a row falls in. Each segment can then be read from an index,
+    # and a slice only reads the segments it overlaps. The segment filters
+    # must partition the queryset.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._segments = ()
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._segments = self._segments
+        return clone
+
+    def segmented(self, *segments):
+        clone = self._chain()
+        clone._segments = segments
+        return clone
+
+    def order_by(self, *field_names):
+        clone = super().order_by(*field_names)
+        clone._segments = ()
+        return clone
+
+    def _fetch_all(self):
+        if self._segments and self._result_cache is None:
+            self._result_cache = self._fetch_segments()
+            self._prefetch_done = True
+        super()._fetch_all()
+
+    def _fetch_segments(self):
+        offset, high = self.query.low_mark, self.query.high_mark
+        wanted = None if high is None else high - offset
+        base = self._chain()
+        base._segments = ()
+        base.query.clear_limits()
+
+        rows = []
+        for segment in self._segments:
+            if wanted is not None and len(rows) >= wanted:
+                break
+            queryset = base.filter(segment)
+            stop = None if wanted is None else offset + wanted - len(rows)
+            found = list(queryset[offset:stop])
+            rows.extend(found)
+            # Past the end of this segment: the offset carries over into the
+            # next one, minus the rows skipped here.
+            if offset and not found:
+                offset = max(offset - queryset.count(), 0)
+            else:
+                offset = 0
+        return rows
+
+
 class Post(models.Model):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -26,6 +87,10 @@ class Post(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     content = models.TextField()
+    content_html = models.TextField(blank=True, editable=False)
+    content_html_version = models.PositiveSmallIntegerField(
+        default=0, editable=False
+    )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='posts'
     )
@@ -34,11 +99,20 @@ class Post(models.Model):
         max_length=10, choices=STATUS_CHOICES, default='draft'
     )
     tags = models.ManyToManyField(Tag, related_name='posts', blank=True)
+    views = models.PositiveBigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ['-published_at']
+        indexes = [
+            models.Index(fields=['-published_at'], name='post_published_idx'),
+            models.Index(fields=['updated_at', 'id'], name='post_updated_idx'),
+            models.Index(fields=['-views'], name='post_views_idx'),
+            GinIndex(SEARCH_VECTOR, name='post_search_idx'),
+        ]
 
     def clean(self):
         super().clean()
@@ -64,10 +138,106 @@ class Post(models.Model):
                 }
             )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._rendered_content = instance.__dict__.get('content')
+        if {'status', 'published_at'} <= instance.__dict__.keys():
+            instance._was_public = instance.is_public
+            instance._publication = (instance.status, instance.published_at)
+        return instance
+
+    @property
+    def is_public(self):
+        return (
+            self.status == 'published'
+            and self.published_at is not None
+            and self.published_at <= timezone.now()
+        )
+
+    def render_content(self):
+        self.content_html = render_markdown(self.content)
+        self.content_html_version = RENDERER_VERSION
+        self._rendered_content = self.content
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+
+        update_fields = kwargs.get('update_fields')
+        if (
+            'content' in self.__dict__
+            and self.content != getattr(self, '_rendered_content', None)
+            and (update_fields is None or 'content' in update_fields)
+        ):
+            self.render_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields,
+                    'content_html',
+                    'content_html_version',
+                }
+
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
+
+
+class RelatedPost(models.Model):
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name='related_posts'
+    )
+    related = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name='+'
+    )
+    shared_tags = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'related'], name='related_post_unique'
+            ),
+        ]
+
+
+class PostTombstone(models.Model):
+    # Left behind for the change feed by public posts that are deleted or
+    # unpublished.
+    post_id = models.BigIntegerField(primary_key=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['deleted_at', 'post_id'], name='tombstone_deleted_idx'
+            ),
+        ]
+
+
+class Task(models.Model):
+    # Deferred work, run by the run_tasks command. A pending task is unique
+    # per (name, key), so enqueueing the same work again before it runs is a
+    # no-op; `version` tells a worker whether it was re-enqueued while it
+    # ran. run_after is NULL once a task has used up its attempts.
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=200)
+    args = models.JSONField(default=dict)
+    run_after = models.DateTimeField(null=True, default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    version = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'key'], name='task_key_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['run_after'], name='task_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name}:{self.key}'
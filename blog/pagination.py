@@ -0,0 +1,184 @@
+import hashlib
+import json
+from functools import partial
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+from .metrics import get_metrics
+
+
+def estimated_table_count(model, using='default'):
+    # reltuples is maintained by VACUUM/ANALYZE and is -1 for a table that has
+    # never been analyzed.
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else -1
+
+
+class EstimatedCountPaginator(Paginator):
+    # Below this many rows an exact COUNT(*) is cheap enough to keep.
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_table_count(queryset.model, queryset.db)
+            if estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
+
+
+def explain_row_estimate(queryset):
+    # The planner's row estimate for the top plan node, which for a count is
+    # the number of rows the query would return.
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        (plan,) = cursor.fetchone()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CachedCountPaginator(Paginator):
+    def __init__(
+        self,
+        object_list,
+        per_page,
+        *,
+        cache_key,
+        timeout,
+        estimate_threshold,
+        **kwargs,
+    ):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.timeout = timeout
+        self.estimate_threshold = estimate_threshold
+
+    @cached_property
+    def count_info(self):
+        # (count, approximate, cached). Counts are shared by every request
+        # with the same filter.
+        info = cache.get(self.cache_key)
+        get_metrics().record_cache(
+            'post_counts', info is not None, info is None
+        )
+        if info is not None:
+            return (*info, True)
+        estimate = explain_row_estimate(self.object_list)
+        if estimate >= self.estimate_threshold:
+            info = (estimate, True)
+        else:
+            info = (super().count, False)
+        cache.set(self.cache_key, info, self.timeout)
+        return (*info, False)
+
+    @property
+    def count(self):
+        return self.count_info[0]
+
+    @property
+    def approximate(self):
+        return self.count_info[1]
+
+    @property
+    def bounded(self):
+        # Only a count taken by this request bounds the pages; an estimate,
+        # or an exact count cached before posts were added, can fall short.
+        return not (self.approximate or self.count_info[2])
+
+    def validate_number(self, number):
+        # Past the last counted page, pages are still served (possibly
+        # empty) unless the count bounds them.
+        if self.bounded:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.bounded:
+            return super().page(number)
+        # Paginator.page() would cut the slice off at the count.
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom : bottom + self.per_page], number, self
+        )
+
+
+class CachedCountPagination(PageNumberPagination):
+    # Counts are cached per viewer and normalized filter for this long.
+    count_cache_timeout = 30
+    # Above this many estimated rows the planner estimate is returned as an
+    # approximate count instead of running COUNT(*).
+    estimate_threshold = 100_000
+    # Query parameters that change the representation but not the rows.
+    ignored_query_params = (
+        'facets',
+        'format',
+        'include',
+        'ordering',
+        'profile',
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            cache_key=self.get_count_cache_key(queryset, request),
+            timeout=self.count_cache_timeout,
+            estimate_threshold=self.estimate_threshold,
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count_cache_key(self, queryset, request):
+        ignored = {
+            self.page_query_param,
+            self.page_size_query_param,
+            *self.ignored_query_params,
+        }
+        params = sorted(
+            (name, sorted(value.strip() for value in values))
+            for name, values in request.query_params.lists()
+            if name not in ignored
+        )
+        viewer = request.user.pk if request.user.is_authenticated else ''
+        digest = hashlib.md5(
+            repr((queryset.model._meta.label, viewer, params)).encode()
+        ).hexdigest()
+        return f'page-count:{digest}'
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                'count': self.page.paginator.count,
+                'count_approximate': self.page.paginator.approximate,
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'results': data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_approximate'] = {
+            'type': 'boolean',
+            'example': False,
+        }
+        return response_schema
@@ -0,0 +1,213 @@
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAM = 'profile'
+PROFILERS = {'1': 'cprofile', 'cprofile': 'cprofile', 'sample': 'sample'}
+SUFFIXES = {'cprofile': '.prof', 'sample': '.collapsed'}
+
+# From Python 3.12 cProfile hooks every thread, so only one request per
+# process runs under it; concurrent ones fall back to the sampler.
+cprofile_lock = threading.Lock()
+
+
+class Sampler:
+    # Samples the stack of one thread from a background thread, so the
+    # profiled code runs at full speed between samples. Stacks are written
+    # in the collapsed format read by flame graph tools.
+    def __init__(self, interval):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})'
+                )
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def dump_stats(self, path):
+        Path(path).write_text(
+            ''.join(
+                f'{stack} {count}\n'
+                for stack, count in self.stacks.most_common()
+            )
+        )
+
+
+class QueryLog:
+    # Installed with connection.execute_wrapper() for the profiled request.
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    'alias': context['connection'].alias,
+                    'sql': sql,
+                    'params': None if many else repr(params),
+                    'ms': (time.perf_counter() - start) * 1000,
+                }
+            )
+
+
+def requested_profiler(request):
+    flag = request.headers.get(PROFILE_HEADER) or request.GET.get(
+        PROFILE_PARAM
+    )
+    return PROFILERS.get(flag)
+
+
+def is_staff_caller(request):
+    # Authenticates the way the API views will (session, token or basic),
+    # so that nothing is profiled before the caller is known to be staff.
+    authenticators = [
+        authentication()
+        for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    ]
+    try:
+        return Request(request, authenticators=authenticators).user.is_staff
+    except APIException:
+        return False
+
+
+def profile_dir():
+    return Path(settings.BLOG_PROFILE_DIR)
+
+
+def save_profile(request, response, profiler, collector, log, seconds):
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    now = timezone.now()
+    profile_id = f'{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}'
+
+    collector.dump_stats(directory / f'{profile_id}{SUFFIXES[profiler]}')
+    (directory / f'{profile_id}.json').write_text(
+        json.dumps(
+            {
+                'id': profile_id,
+                'created': now.isoformat(),
+                'method': request.method,
+                'path': request.get_full_path(),
+                'user': request.user.get_username(),
+                'status': response.status_code,
+                'profiler': profiler,
+                'ms': seconds * 1000,
+                'query_ms': sum(query['ms'] for query in log.queries),
+                'queries': log.queries,
+            }
+        )
+    )
+
+    # Only the newest BLOG_PROFILE_KEEP profiles are kept.
+    for meta in list_profiles()[settings.BLOG_PROFILE_KEEP :]:
+        for path in directory.glob(f'{meta["id"]}.*'):
+            path.unlink(missing_ok=True)
+    return profile_id
+
+
+def list_profiles():
+    profiles = []
+    for path in profile_dir().glob('*.json'):
+        try:
+            meta = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        meta['query_count'] = len(meta.pop('queries'))
+        profiles.append(meta)
+    return sorted(profiles, key=lambda meta: meta['created'], reverse=True)
+
+
+def load_profile(profile_id, limit=60):
+    # Returns the metadata, the SQL log and a text report of the profile.
+    path = profile_dir() / f'{profile_id}.json'
+    if not path.is_file():
+        return None
+    meta = json.loads(path.read_text())
+    data_path = path.with_suffix(SUFFIXES[meta['profiler']])
+    if meta['profiler'] == 'cprofile':
+        out = io.StringIO()
+        stats = pstats.Stats(str(data_path), stream=out)
+        stats.sort_stats('cumulative').print_stats(limit)
+        meta['report'] = out.getvalue()
+    else:
+        lines = data_path.read_text().splitlines()
+        meta['report'] = '\n'.join(lines[:limit])
+    meta['data_path'] = data_path
+    return meta
+
+
+class ProfilingMiddleware:
+    # Profiles a request that carries the X-Profile header or a ?profile=
+    # flag ('1' or 'cprofile' for cProfile, 'sample' for the stack
+    # sampler) and comes from a staff user; the flag is ignored for anyone
+    # else. The profile id is returned in the X-Profile-Id header.
+    #
+    # Profilers follow a single thread, so this middleware is sync only:
+    # under ASGI, Django runs it and the views below it in a worker thread.
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profiler = requested_profiler(request)
+        if profiler is None or not is_staff_caller(request):
+            return self.get_response(request)
+
+        log = QueryLog()
+        with ExitStack() as stack:
+            if profiler == 'cprofile' and cprofile_lock.acquire(False):
+                stack.callback(cprofile_lock.release)
+                collector = cProfile.Profile()
+            else:
+                profiler = 'sample'
+                collector = Sampler(settings.BLOG_PROFILE_SAMPLE_INTERVAL)
+            start = time.perf_counter()
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(log))
+            stack.enter_context(collector)
+            response = self.get_response(request)
+            seconds = time.perf_counter() - start
+
+        response.headers['X-Profile-Id'] = save_profile(
+            request, response, profiler, collector, log, seconds
+        )
+        return response
@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.db import connection
+
+from .models import Post, RelatedPost
+
+# Neighbors of a post are the published posts sharing at least one tag with
+# it, ranked by the number of shared tags and then by recency. Scheduled
+# posts are kept, since they go public without a write, and are hidden at
+# read time like other posts the viewer cannot see. Only the top
+# BLOG_RELATED_POSTS_STORED neighbors are kept per post, which leaves room
+# for posts that are hidden from the viewer at read time.
+
+RANKED_NEIGHBORS = """
+    SELECT post_id, related_id, shared_tags
+    FROM (
+        SELECT
+            a.post_id,
+            b.post_id AS related_id,
+            count(*) AS shared_tags,
+            row_number() OVER (
+                PARTITION BY a.post_id
+                ORDER BY count(*) DESC, p.published_at DESC NULLS LAST,
+                    b.post_id DESC
+            ) AS rank
+        FROM {post_tags} a
+        JOIN {post_tags} b ON b.tag_id = a.tag_id AND b.post_id <> a.post_id
+        JOIN {post} p ON p.id = b.post_id
+        WHERE a.post_id = ANY(%(post_ids)s)
+          AND p.status = 'published'
+          AND p.published_at IS NOT NULL
+        GROUP BY a.post_id, b.post_id, p.published_at
+    ) ranked
+    WHERE rank <= %(stored)s
+"""
+
+DELETE_NEIGHBORS = """
+    DELETE FROM {related} WHERE post_id = ANY(%(post_ids)s)
+"""
+
+INSERT_NEIGHBORS = """
+    INSERT INTO {related} (post_id, related_id, shared_tags)
+"""
+
+DELETE_AS_NEIGHBOR = """
+    DELETE FROM {related} WHERE related_id = %(post_id)s
+"""
+
+# Offer the post to the posts it shares a tag with, but only write it into
+# lists that are not full or whose lowest-ranked neighbor it outranks; the
+# lists that grow past the limit are trimmed below. Ranks compare as rows,
+# with a missing published_at sorting lowest.
+INSERT_AS_NEIGHBOR = """
+    INSERT INTO {related} (post_id, related_id, shared_tags)
+    SELECT n.post_id, p.id, n.shared_tags
+    FROM (
+        SELECT b.post_id, count(*) AS shared_tags
+        FROM {post_tags} a
+        JOIN {post_tags} b ON b.tag_id = a.tag_id AND b.post_id <> a.post_id
+        WHERE a.post_id = %(post_id)s
+        GROUP BY b.post_id
+    ) n
+    JOIN {post} p
+        ON p.id = %(post_id)s
+        AND p.status = 'published'
+        AND p.published_at IS NOT NULL
+    LEFT JOIN LATERAL (
+        SELECT r.shared_tags, q.published_at, r.related_id
+        FROM {related} r
+        JOIN {post} q ON q.id = r.related_id
+        WHERE r.post_id = n.post_id
+        ORDER BY r.shared_tags DESC, q.published_at DESC NULLS LAST,
+            r.related_id DESC
+        OFFSET %(stored)s - 1
+        LIMIT 1
+    ) lowest ON true
+    WHERE lowest.related_id IS NULL
+       OR (n.shared_tags, COALESCE(p.published_at, '-infinity'), p.id)
+        > (
+            lowest.shared_tags,
+            COALESCE(lowest.published_at, '-infinity'),
+            lowest.related_id
+        )
+    RETURNING post_id
+"""
+
+TRIM_NEIGHBORS = """
+    DELETE FROM {related} r
+    USING (
+        SELECT
+            r.id,
+            row_number() OVER (
+                PARTITION BY r.post_id
+                ORDER BY r.shared_tags DESC, p.published_at DESC NULLS LAST,
+                    r.related_id DESC
+            ) AS rank
+        FROM {related} r
+        JOIN {post} p ON p.id = r.related_id
+        WHERE r.post_id = ANY(%(post_ids)s)
+    ) ranked
+    WHERE ranked.id = r.id AND ranked.rank > %(stored)s
+"""
+
+
+def execute(cursor, sql, params):
+    cursor.execute(
+        sql.format(
+            post=Post._meta.db_table,
+            post_tags=Post.tags.through._meta.db_table,
+            related=RelatedPost._meta.db_table,
+        ),
+        params,
+    )
+
+
+def rebuild_related(post_ids):
+    # Replace the neighbor lists of `post_ids` with freshly ranked ones.
+    params = {
+        'post_ids': list(post_ids),
+        'stored': settings.BLOG_RELATED_POSTS_STORED,
+    }
+    with connection.cursor() as cursor:
+        execute(cursor, DELETE_NEIGHBORS, params)
+        execute(cursor, INSERT_NEIGHBORS + RANKED_NEIGHBORS, params)
+        return cursor.rowcount
+
+
+def refresh_related(post_id):
+    # A post's own list is rebuilt exactly. In the lists of other posts it
+    # is re-ranked in place; a list it drops out of is not backfilled and
+    # keeps one neighbor fewer until the next rebuild.
+    params = {
+        'post_id': post_id,
+        'post_ids': [post_id],
+        'stored': settings.BLOG_RELATED_POSTS_STORED,
+    }
+    rebuild_related([post_id])
+    with connection.cursor() as cursor:
+        execute(cursor, DELETE_AS_NEIGHBOR, params)
+        execute(cursor, INSERT_AS_NEIGHBOR, params)
+        params['post_ids'] = [row[0] for row in cursor.fetchall()]
+        execute(cursor, TRIM_NEIGHBORS, params)
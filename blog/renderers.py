@@ -0,0 +1,82 @@
+import codecs
+
+import orjson
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser, get_encoding
+from rest_framework.utils.encoders import JSONEncoder
+
+from .fragments import PostFragments
+
+# Datetimes are passed through to DRF's encoder so they keep its format
+# ('Z' suffix, full precision) instead of orjson's.
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        results = data.get('results') if isinstance(data, dict) else None
+        if isinstance(results, PostFragments):
+            if self.can_splice(accepted_media_type, renderer_context or {}):
+                # 'results' is the last key of a paginated response, so the
+                # fragments are appended to the rendered envelope.
+                envelope = self.encode(
+                    {k: v for k, v in data.items() if k != 'results'},
+                    accepted_media_type,
+                    renderer_context,
+                )
+                separator = b',' if envelope != b'{}' else b''
+                return b''.join(
+                    [
+                        envelope[:-1],
+                        separator,
+                        b'"results":[',
+                        b','.join(results.raw),
+                        b']}',
+                    ]
+                )
+            data = {**data, 'results': results.decoded}
+
+        if isinstance(data, PostFragments):
+            if self.can_splice(accepted_media_type, renderer_context or {}):
+                return b'[' + b','.join(data.raw) + b']'
+            data = data.decoded
+
+        return self.encode(data, accepted_media_type, renderer_context)
+
+    def can_splice(self, accepted_media_type, renderer_context):
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        return indent is None and self.compact and not self.ensure_ascii
+
+    def encode(self, data, accepted_media_type, renderer_context):
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class ORJSONRenderer(JSONRenderer):
+    default = staticmethod(JSONEncoder().default)
+
+    def encode(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b''
+
+        if not self.can_splice(accepted_media_type, renderer_context or {}):
+            return super().encode(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.default, option=OPTIONS)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = get_encoding(parser_context or {})
+        if codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
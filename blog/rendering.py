@@ -0,0 +1,26 @@
+import nh3
+
+# Bump whenever the extensions or the sanitizer policy below change, then
+# run `manage.py render_posts` to re-render the stored corpus.
+RENDERER_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'tables', 'sane_lists']
+
+ALLOWED_TAGS = nh3.ALLOWED_TAGS
+ALLOWED_ATTRIBUTES = {
+    **nh3.ALLOWED_ATTRIBUTES,
+    'code': {'class'},
+}
+
+
+def render_markdown(text):
+    # Imported on first use: only writes and render_posts need Markdown, and
+    # it is a noticeable share of worker import time.
+    import markdown
+
+    html = markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+    return nh3.clean(html, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES)
+
+
+def render_batch(batch):
+    return [(pk, render_markdown(content)) for pk, content in batch]
@@ -1,3 +1,6 @@
+from django.contrib.auth import authenticate
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.utils import timezone
 from rest_framework import serializers
 
@@ -10,6 +13,55 @@ class TagSerializer(serializers.ModelSerializer):
         fields = ['id', 'name']
 
 
+class TagListField(serializers.ListField):
+    # Accepts tag ids (numeric values) or names and resolves them all with
+    # one query. Names are matched case-insensitively; unknown names become
+    # unsaved tags that save_tags() creates.
+    child = serializers.CharField(max_length=50)
+    default_error_messages = {
+        'does_not_exist': 'Invalid pk "{pk_value}" - object does not exist.',
+    }
+
+    def to_internal_value(self, data):
+        values = super().to_internal_value(data)
+        ids = {int(value) for value in values if value.isdecimal()}
+        names = {value.lower() for value in values if not value.isdecimal()}
+
+        by_id, by_name = {}, {}
+        for tag in Tag.objects.annotate(lower_name=Lower('name')).filter(
+            Q(pk__in=ids) | Q(lower_name__in=names)
+        ):
+            by_id[tag.pk] = tag
+            by_name[tag.lower_name] = tag
+
+        if missing := ids - by_id.keys():
+            self.fail('does_not_exist', pk_value=min(missing))
+
+        tags = {}
+        for value in values:
+            if value.isdecimal():
+                tag = by_id[int(value)]
+            else:
+                tag = by_name.setdefault(value.lower(), Tag(name=value))
+            tags[id(tag)] = tag
+        return list(tags.values())
+
+    def to_representation(self, value):
+        return [tag.pk for tag in value.all()]
+
+
+def save_tags(tags):
+    # Creates the unsaved tags in one statement; rows that a concurrent
+    # request inserted first are ignored and read back instead.
+    new = [tag for tag in tags if tag.pk is None]
+    if not new:
+        return tags
+
+    Tag.objects.bulk_create(new, ignore_conflicts=True)
+    saved = Tag.objects.in_bulk([tag.name for tag in new], field_name='name')
+    return [tag if tag.pk is not None else saved[tag.name] for tag in tags]
+
+
 class PostSerializer(serializers.HyperlinkedModelSerializer):
     author = serializers.ReadOnlyField(source='author.username')
 
@@ -26,17 +78,34 @@ class PostSerializer(serializers.HyperlinkedModelSerializer):
             'updated_at',
             'published_at',
             'status',
+            'views',
             'content',
+            'content_html',
         ]
+        optional_fields = ['content_html']
+
+    @classmethod
+    def included_optional_fields(cls, request):
+        if request is None:
+            return []
+
+        requested = {
+            name.strip()
+            for name in request.query_params.get('include', '').split(',')
+        }
+        return [name for name in cls.Meta.optional_fields if name in requested]
 
     def get_fields(self):
         fields = super().get_fields()
         request = self.context.get('request', None)
 
+        included = self.included_optional_fields(request)
+        for name in self.Meta.optional_fields:
+            if name not in included:
+                fields.pop(name)
+
         if request and request.method in ['POST', 'PUT', 'PATCH']:
-            fields['tags'] = serializers.PrimaryKeyRelatedField(
-                many=True, queryset=Tag.objects.all(), required=False
-            )
+            fields['tags'] = TagListField(required=False)
         else:
             fields['tags'] = serializers.StringRelatedField(many=True)
 
@@ -71,3 +140,34 @@ class PostSerializer(serializers.HyperlinkedModelSerializer):
                 data['published_at'] = None
 
         return data
+
+    def create(self, validated_data):
+        if 'tags' in validated_data:
+            validated_data['tags'] = save_tags(validated_data['tags'])
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        # ModelSerializer assigns tags with set(), which only adds and
+        # removes the difference.
+        if 'tags' in validated_data:
+            validated_data['tags'] = save_tags(validated_data['tags'])
+        return super().update(instance, validated_data)
+
+
+class TokenObtainSerializer(serializers.Serializer):
+    username = serializers.CharField()
+    password = serializers.CharField(write_only=True)
+
+    def validate(self, data):
+        user = authenticate(
+            request=self.context.get('request'),
+            username=data['username'],
+            password=data['password'],
+        )
+        if user is None:
+            raise serializers.ValidationError(
+                'Unable to log in with the provided credentials.'
+            )
+
+        data['user'] = user
+        return data
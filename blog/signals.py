@@ -0,0 +1,204 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .events import get_event_transport, post_event
+from .models import Post, PostTombstone, Tag
+from .related import refresh_related
+from .tasks import enqueue, enqueue_many, enqueue_returning, task
+
+User = get_user_model()
+
+# Cached post fragments are keyed by updated_at, so anything that changes a
+# post's representation without saving the post bumps updated_at instead.
+# Retagging a post touches it right away; renaming or deleting a tag and
+# renaming an author can touch any number of posts and are left to the task
+# queue.
+
+
+def touch_posts(posts):
+    posts.update(updated_at=timezone.now())
+
+
+TOUCH_LOOKUPS = {
+    'post_id': 'pk__in',
+    'tag_id': 'tags__in',
+    'author_id': 'author__in',
+}
+
+
+@task('touch_posts')
+def touch_posts_task(batch):
+    query = Q()
+    for arg, lookup in TOUCH_LOOKUPS.items():
+        if ids := {args[arg] for args in batch if arg in args}:
+            query |= Q(**{lookup: ids})
+    if query:
+        touch_posts(Post.objects.filter(query))
+
+
+# Only posts that were public leave a tombstone, so the change feed never
+# reveals a draft. leave_tombstone_of_unpublished_post must run before
+# publish_saved_post, which moves _was_public on.
+
+
+def leave_tombstone(post_id, removed_at):
+    PostTombstone.objects.update_or_create(
+        post_id=post_id, defaults={'deleted_at': removed_at}
+    )
+
+
+@receiver(post_save, sender=Post)
+def leave_tombstone_of_unpublished_post(sender, instance, **kwargs):
+    if instance.__dict__.get('_was_public') and not instance.is_public:
+        leave_tombstone(instance.pk, instance.updated_at)
+
+
+@receiver(post_delete, sender=Post)
+def leave_tombstone_of_deleted_post(sender, instance, **kwargs):
+    instance._deleted_at = timezone.now()
+    if instance.__dict__.get('_was_public') or instance.is_public:
+        leave_tombstone(instance.pk, instance._deleted_at)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def touch_retagged_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            instance.updated_at = timezone.now()
+            touch_posts(Post.objects.filter(pk=instance.pk))
+    elif action in ('post_add', 'post_remove'):
+        touch_posts(Post.objects.filter(pk__in=pk_set))
+    elif action == 'pre_clear':
+        touch_posts(instance.posts.all())
+
+
+@receiver(post_save, sender=Tag)
+def touch_posts_of_renamed_tag(sender, instance, created, **kwargs):
+    if not created:
+        enqueue('touch_posts', f'tag:{instance.pk}', tag_id=instance.pk)
+
+
+# The links of a deleted tag are removed up front, and the ids of their
+# posts go straight from the DELETE into one task.
+UNLINK_TAG = """
+    DELETE FROM {post_tags} WHERE tag_id = %(tag_id)s RETURNING post_id
+"""
+
+
+@task('untag_posts')
+def untag_posts_task(batch):
+    pks = {pk for args in batch for pk in args['post_ids']}
+    if pks:
+        touch_posts(Post.objects.filter(pk__in=pks))
+        enqueue_refresh_related(pks)
+
+
+@receiver(pre_delete, sender=Tag)
+def untag_posts_of_deleted_tag(sender, instance, **kwargs):
+    enqueue_returning(
+        'untag_posts',
+        f'tag:{instance.pk}',
+        'post_ids',
+        UNLINK_TAG.format(post_tags=Post.tags.through._meta.db_table),
+        {'tag_id': instance.pk},
+    )
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields, **kwargs):
+    if instance.pk is None or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    instance._previous_username = (
+        User.objects.filter(pk=instance.pk)
+        .values_list('username', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=User)
+def touch_posts_of_renamed_author(sender, instance, **kwargs):
+    previous = instance.__dict__.pop('_previous_username', None)
+    if previous is not None and previous != instance.username:
+        enqueue('touch_posts', f'author:{instance.pk}', author_id=instance.pk)
+
+
+# Related-post lists are refreshed, through the task queue, for every post
+# whose tags change.
+
+
+@task('refresh_related')
+def refresh_related_task(batch):
+    for pk in sorted({args['post_id'] for args in batch}):
+        refresh_related(pk)
+
+
+def enqueue_refresh_related(pks):
+    enqueue_many('refresh_related', {pk: {'post_id': pk} for pk in pks})
+
+
+@receiver(post_save, sender=Post)
+def refresh_related_of_republished_post(sender, instance, created, **kwargs):
+    # Drafts are left out of neighbor lists, and recency ranks the rest.
+    previous = instance.__dict__.get('_publication')
+    instance._publication = (instance.status, instance.published_at)
+    if not created and previous not in (None, instance._publication):
+        enqueue_refresh_related([instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def refresh_related_of_retagged_posts(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            enqueue_refresh_related([instance.pk])
+        return
+
+    if action == 'pre_clear':
+        instance._cleared_post_ids = list(
+            instance.posts.values_list('pk', flat=True)
+        )
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_cleared_post_ids', ())
+    elif action not in ('post_add', 'post_remove'):
+        return
+
+    enqueue_refresh_related(pk_set)
+
+
+# Changes to public posts are pushed to event stream subscribers once the
+# transaction commits.
+
+
+def publish_event(event):
+    transaction.on_commit(lambda: get_event_transport().publish(event))
+
+
+@receiver(post_save, sender=Post)
+def publish_saved_post(sender, instance, **kwargs):
+    was_public = instance.__dict__.get('_was_public', False)
+    instance._was_public = instance.is_public
+    if instance.is_public:
+        kind = 'update' if was_public else 'publish'
+        publish_event(post_event(kind, instance, instance.updated_at))
+    elif was_public:
+        publish_event(post_event('delete', instance, instance.updated_at))
+
+
+@receiver(post_delete, sender=Post)
+def publish_deleted_post(sender, instance, **kwargs):
+    if instance.is_public:
+        publish_event(post_event('delete', instance, instance._deleted_at))
@@ -0,0 +1,200 @@
+import json
+import logging
+from itertools import groupby
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# Handlers take the args of a batch of tasks with the same name.
+TASKS = {}
+
+# Enqueueing work that is already pending only bumps its version. A task
+# that has failed for good is revived; one that is running keeps its lease
+# and is rerun by the worker once it sees the new version.
+UPSERT = """
+    ON CONFLICT (name, key) DO UPDATE
+    SET args = EXCLUDED.args,
+        version = {task}.version + 1,
+        attempts = CASE
+            WHEN {task}.run_after IS NULL THEN 0 ELSE {task}.attempts
+        END,
+        run_after = COALESCE({task}.run_after, EXCLUDED.run_after)
+"""
+
+ENQUEUE = (
+    """
+    INSERT INTO {task} (
+        name, key, args, run_after, attempts, version, last_error, created_at
+    )
+    SELECT %(name)s, n.key, n.args::jsonb, now(), 0, 0, '', now()
+    FROM unnest(%(keys)s::text[], %(args)s::text[]) AS n(key, args)
+"""
+    + UPSERT
+)
+
+# One task whose `arg` lists the values returned by a statement, so a long
+# list is collected by the database instead of passing through Python.
+ENQUEUE_RETURNING = (
+    """
+    WITH returned AS ({statement})
+    INSERT INTO {task} (
+        name, key, args, run_after, attempts, version, last_error, created_at
+    )
+    SELECT
+        %(name)s, %(key)s,
+        jsonb_build_object(%(arg)s, COALESCE(jsonb_agg(r.value), '[]')),
+        now(), 0, 0, '', now()
+    FROM returned AS r(value)
+"""
+    + UPSERT
+)
+
+# Claimed tasks are leased rather than locked for the length of the batch,
+# so enqueueing never waits on a worker.
+CLAIM = """
+    UPDATE {task} t
+    SET run_after = now() + make_interval(secs => %(lease)s),
+        attempts = t.attempts + 1
+    FROM (
+        SELECT id FROM {task}
+        WHERE run_after <= now()
+        ORDER BY run_after
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    ) due
+    WHERE t.id = due.id
+    RETURNING t.id, t.name, t.args, t.version
+"""
+
+COMPLETE = """
+    DELETE FROM {task} t
+    USING unnest(%(ids)s::bigint[], %(versions)s::int[]) AS d(id, version)
+    WHERE t.id = d.id AND t.version = d.version
+"""
+
+# Whatever COMPLETE left behind was re-enqueued while it ran.
+RELEASE = """
+    UPDATE {task} SET run_after = now(), attempts = 0 WHERE id = ANY(%(ids)s)
+"""
+
+RETRY = """
+    UPDATE {task} t
+    SET run_after = CASE
+            WHEN t.version <> d.version THEN now()
+            WHEN t.attempts >= %(max_attempts)s THEN NULL
+            ELSE now() + make_interval(
+                secs => %(delay)s * 2 ^ (t.attempts - 1)
+            )
+        END,
+        attempts = CASE
+            WHEN t.version <> d.version THEN 0 ELSE t.attempts
+        END,
+        last_error = %(error)s
+    FROM unnest(%(ids)s::bigint[], %(versions)s::int[]) AS d(id, version)
+    WHERE t.id = d.id
+"""
+
+
+def task(name):
+    def register(handler):
+        TASKS[name] = handler
+        return handler
+
+    return register
+
+
+def execute(cursor, sql, params, **parts):
+    cursor.execute(sql.format(task=Task._meta.db_table, **parts), params)
+
+
+def enqueue(name, key, **args):
+    enqueue_many(name, {key: args})
+
+
+def enqueue_many(name, tasks):
+    # `tasks` maps idempotency keys to handler arguments.
+    if not tasks:
+        return
+    if settings.BLOG_TASKS_EAGER:
+        TASKS[name](list(tasks.values()))
+        return
+    params = {
+        'name': name,
+        'keys': [str(key) for key in tasks],
+        'args': [json.dumps(args) for args in tasks.values()],
+    }
+    with connection.cursor() as cursor:
+        execute(cursor, ENQUEUE, params)
+
+
+def enqueue_returning(name, key, arg, statement, params):
+    # `statement` returns a single column, e.g. DELETE ... RETURNING id, and
+    # takes named `params`.
+    if settings.BLOG_TASKS_EAGER:
+        with connection.cursor() as cursor:
+            cursor.execute(statement, params)
+            values = [value for (value,) in cursor.fetchall()]
+        TASKS[name]([{arg: values}])
+        return
+    params = {**params, 'name': name, 'key': str(key), 'arg': arg}
+    with connection.cursor() as cursor:
+        execute(cursor, ENQUEUE_RETURNING, params, statement=statement)
+
+
+def claim(limit):
+    params = {'lease': settings.BLOG_TASK_LEASE, 'limit': limit}
+    with connection.cursor() as cursor:
+        execute(cursor, CLAIM, params)
+        return sorted(cursor.fetchall(), key=lambda row: row[1])
+
+
+def complete(rows):
+    params = {
+        'ids': [row[0] for row in rows],
+        'versions': [row[3] for row in rows],
+    }
+    with connection.cursor() as cursor:
+        execute(cursor, COMPLETE, params)
+        execute(cursor, RELEASE, params)
+
+
+def retry(rows, error):
+    params = {
+        'ids': [row[0] for row in rows],
+        'versions': [row[3] for row in rows],
+        'max_attempts': settings.BLOG_TASK_MAX_ATTEMPTS,
+        'delay': settings.BLOG_TASK_RETRY_DELAY,
+        'error': error,
+    }
+    with connection.cursor() as cursor:
+        execute(cursor, RETRY, params)
+
+
+def run(name, rows):
+    try:
+        handler = TASKS[name]
+        with transaction.atomic():
+            handler([json.loads(row[2]) for row in rows])
+    except Exception as exc:
+        if len(rows) > 1:
+            # Find the failing task instead of retrying the whole batch.
+            for row in rows:
+                run(name, [row])
+            return
+        logger.exception('Task %s failed.', name)
+        retry(rows, f'{type(exc).__name__}: {exc}')
+    else:
+        complete(rows)
+
+
+def run_pending(batch_size=100):
+    # Claims up to `batch_size` due tasks and runs them, one handler call
+    # per task name. Returns the number of tasks claimed.
+    rows = claim(batch_size)
+    for name, group in groupby(rows, key=lambda row: row[1]):
+        run(name, list(group))
+    return len(rows)
@@ -0,0 +1,114 @@
+import threading
+import time
+from functools import cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@cache
+def parse_rate(rate):
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+def estimate(previous, current, now, window):
+    # Sliding window counter: the previous fixed window is weighted by how
+    # much of it still overlaps the sliding window ending at `now`.
+    elapsed = (now % window) / window
+    return previous * (1 - elapsed) + current
+
+
+class _Shard:
+    __slots__ = ('lock', 'windows')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # window length -> [slot, current counts, previous counts]
+        self.windows = {}
+
+
+class LocalBackend:
+    def __init__(self, shards=64):
+        self.shards = [_Shard() for _ in range(shards)]
+
+    def hit(self, key, limit, window, now):
+        shard = self.shards[hash(key) % len(self.shards)]
+        slot = int(now // window)
+
+        with shard.lock:
+            state = shard.windows.get(window)
+            if state is None or state[0] != slot:
+                # Rolling over drops every counter older than one window, so
+                # idle clients are evicted without a sweep.
+                previous = state[1] if state and state[0] == slot - 1 else {}
+                state = shard.windows[window] = [slot, {}, previous]
+
+            _, current, previous = state
+            count = current.get(key, 0)
+            if estimate(previous.get(key, 0), count, now, window) >= limit:
+                return False
+
+            current[key] = count + 1
+            return True
+
+
+class CacheBackend:
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def hit(self, key, limit, window, now):
+        slot = int(now // window)
+        current_key = f'throttle:{window}:{slot}:{key}'
+        previous_key = f'throttle:{window}:{slot - 1}:{key}'
+
+        counts = self.cache.get_many([current_key, previous_key])
+        count = counts.get(current_key, 0)
+        if estimate(counts.get(previous_key, 0), count, now, window) >= limit:
+            return False
+
+        if not self.cache.add(current_key, 1, timeout=window * 2):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                self.cache.set(current_key, 1, timeout=window * 2)
+        return True
+
+
+@cache
+def get_throttle_backend():
+    return import_string(settings.BLOG_THROTTLE_BACKEND)()
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    write_scope = 'write'
+
+    def get_scope(self, request, view):
+        if request.method not in SAFE_METHODS:
+            return self.write_scope
+        return getattr(view, 'throttle_scope', None)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'anon:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+
+        limit, self.window = parse_rate(rate)
+        self.now = time.time()
+        key = f'{scope}:{self.get_cache_key(request, view)}'
+        return get_throttle_backend().hit(key, limit, self.window, self.now)
+
+    def wait(self):
+        return self.window - self.now % self.window
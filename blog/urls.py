@@ -1,11 +1,56 @@
 from django.urls import path
 
-from .views import APIRoot, PostDetail, PostList, TagDetail, TagList
+from .events import post_events
+from .feeds import PostFeed
+from .views import (
+    APIRoot,
+    PostBatch,
+    PostChanges,
+    PostDetail,
+    PostList,
+    RelatedPostList,
+    TagDetail,
+    TagList,
+    TokenObtain,
+    TokenRefresh,
+)
 
 urlpatterns = [
     path('', APIRoot.as_view(), name='api-root'),
     path('posts/', PostList.as_view(), name='post-list'),
+    path('posts/batch/', PostBatch.as_view(), name='post-batch'),
+    path('posts/changes/', PostChanges.as_view(), name='post-changes'),
+    path('posts/events/', post_events, name='post-events'),
     path('posts/<int:pk>/', PostDetail.as_view(), name='post-detail'),
+    path(
+        'posts/<int:pk>/related/',
+        RelatedPostList.as_view(),
+        name='post-related',
+    ),
     path('tags/', TagList.as_view(), name='tag-list'),
     path('tags/<str:name>/', TagDetail.as_view(), name='tag-detail'),
+    path('feeds/posts/', PostFeed.as_view(), name='post-feed'),
+    path(
+        'feeds/posts/<str:feed_format>/',
+        PostFeed.as_view(),
+        name='post-feed',
+    ),
+    path('feeds/tags/<str:tag>/', PostFeed.as_view(), name='tag-feed'),
+    path(
+        'feeds/tags/<str:tag>/<str:feed_format>/',
+        PostFeed.as_view(),
+        name='tag-feed',
+    ),
+    path(
+        'feeds/authors/<str:author>/',
+        PostFeed.as_view(),
+        name='author-feed',
+    ),
+    path(
+        'feeds/authors/<str:author>/<str:feed_format>/',
+        PostFeed.as_view(),
+        name='author-feed',
+    ),
+    path('auth/token/', TokenObtain.as_view(), name='token-obtain'),
+    path('auth/token/refresh/', TokenRefresh.as_view(), name='token-refresh'),
 ]
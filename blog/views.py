@@ -1,17 +1,25 @@
 from datetime import datetime
 
-from django.db.models import Case, IntegerField, Q, Value, When
+from django.conf import settings
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import generics, permissions
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
-from .models import Post, Tag
+from .authentication import SignedTokenAuthentication, issue_token
+from .changes import decode_cursor, encode_cursor, get_changes
+from .counters import get_view_counter
+from .facets import FACET_QUERIES, facet_counts
+from .fragments import FRAGMENT_FIELDS, get_post_fragments
+from .models import Post, RelatedPost, Tag
 from .permissions import IsOwnerOrReadOnly
-from .serializers import PostSerializer, TagSerializer
+from .renderers import JSONRenderer
+from .serializers import PostSerializer, TagSerializer, TokenObtainSerializer
 
 
 class APIRoot(APIView):
@@ -20,6 +28,34 @@ class APIRoot(APIView):
             {
                 'posts': reverse('post-list', request=request),
                 'tags': reverse('tag-list', request=request),
+                'feed': reverse('post-feed', request=request),
+            }
+        )
+
+
+class TokenObtain(APIView):
+    def post(self, request):
+        serializer = TokenObtainSerializer(
+            data=request.data, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            {
+                'token': issue_token(serializer.validated_data['user']),
+                'expires_in': settings.BLOG_TOKEN_MAX_AGE,
+            }
+        )
+
+
+class TokenRefresh(APIView):
+    authentication_classes = [SignedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        return Response(
+            {
+                'token': issue_token(request.user),
+                'expires_in': settings.BLOG_TOKEN_MAX_AGE,
             }
         )
 
@@ -28,11 +64,13 @@ class TagList(generics.ListCreateAPIView):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    throttle_scope = 'list'
 
 
 class TagDetail(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = TagSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    throttle_scope = 'detail'
 
     def get_object(self):
         name = self.kwargs['name']
@@ -42,6 +80,7 @@ class TagDetail(generics.RetrieveUpdateDestroyAPIView):
 class PostList(generics.ListCreateAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    throttle_scope = 'list'
 
     def get_queryset(self):
         user = (
@@ -72,6 +111,11 @@ class PostList(generics.ListCreateAPIView):
                 if tag := tag.strip():
                     queryset = queryset.filter(tags__name__iexact=tag)
 
+        if tags:
+            # Only tag filters join rows that can repeat a post; DISTINCT
+            # elsewhere would keep the ordering from being read off an index.
+            queryset = queryset.distinct()
+
         if author_username := query_params.get('author'):
             queryset = queryset.filter(
                 author__username__iexact=author_username
@@ -112,30 +156,214 @@ class PostList(generics.ListCreateAPIView):
                     }
                 )
 
-        order_by_ownership = Case(
-            When(author=user, then=Value(0)),
-            default=Value(1),
-            output_field=IntegerField(),
-        )
+        ordering = query_params.get('ordering')
+        if ordering == '-views':
+            return queryset.order_by('-views', '-published_at')
+        if ordering:
+            raise ValidationError(
+                {'ordering': "Invalid ordering. Expected '-views'."}
+            )
 
-        order_by_status = Case(
-            When(status='published', then=Value(0)),
-            default=Value(1),
-            output_field=IntegerField(),
+        queryset = queryset.order_by('-published_at')
+        if user is None:
+            return queryset
+
+        # The viewer's published posts, then their drafts, then everyone
+        # else's posts, each segment read in -published_at order.
+        own = Q(author=user)
+        published = Q(status='published')
+        return queryset.segmented(own & published, own & ~published, ~own)
+
+    def list(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if not (
+            isinstance(renderer, JSONRenderer)
+            and renderer.can_splice(request.accepted_media_type, {})
+        ):
+            return super().list(request, *args, **kwargs)
+
+        # Only ids and versions come from the filtered query; the posts
+        # themselves are served from per-post fragments.
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .select_related(None)
+            .prefetch_related(None)
+            .values_list(*FRAGMENT_FIELDS)
         )
-
-        return queryset.distinct().order_by(
-            order_by_ownership, order_by_status, '-published_at'
+        page = self.paginate_queryset(queryset)
+        fragments = get_post_fragments(
+            page if page is not None else list(queryset),
+            self.get_serializer_class(),
+            self.get_serializer_context(),
+            renderer,
         )
 
+        if page is not None:
+            return self.get_paginated_response(fragments)
+        return Response(fragments)
+
+    def get_facet_names(self):
+        names = [
+            name.strip()
+            for name in self.request.query_params.get('facets', '').split(',')
+            if name.strip()
+        ]
+        if unknown := [name for name in names if name not in FACET_QUERIES]:
+            raise ValidationError(
+                {
+                    'facets': f'Unknown facets: {", ".join(unknown)}. '
+                    f'Expected any of: {", ".join(FACET_QUERIES)}.'
+                }
+            )
+        return list(dict.fromkeys(names))
+
+    def paginate_queryset(self, queryset):
+        self.facet_names = self.get_facet_names()
+        self.filtered_queryset = queryset
+        return super().paginate_queryset(queryset)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.facet_names:
+            facets = facet_counts(self.filtered_queryset, self.facet_names)
+            results = response.data.pop('results')
+            response.data['facets'] = facets
+            response.data['results'] = results
+        return response
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
 
+class PostChanges(APIView):
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    throttle_scope = 'list'
+    default_limit = 100
+    max_limit = 1000
+
+    def get(self, request):
+        cursor = request.query_params.get('since') or None
+        since = None
+        if cursor is not None:
+            since = decode_cursor(cursor)
+            if since is None:
+                raise ValidationError({'since': 'Invalid cursor.'})
+
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        limit = min(max(limit, 1), self.max_limit)
+
+        changes, has_more = get_changes(since, limit)
+
+        posts = PostSerializer(
+            [post for _, _, post in changes if post is not None],
+            many=True,
+            context={'request': request},
+        ).data
+        serialized = {item['id']: item for item in posts}
+
+        if changes:
+            cursor = encode_cursor(*changes[-1][:2])
+        next_url = None
+        if cursor is not None:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'since', cursor
+            )
+
+        return Response(
+            {
+                'cursor': cursor,
+                'next': next_url,
+                'has_more': has_more,
+                'results': [
+                    {
+                        'id': pk,
+                        'changed_at': changed_at,
+                        'deleted': post is None,
+                        'post': serialized.get(pk),
+                    }
+                    for changed_at, pk, post in changes
+                ],
+            }
+        )
+
+
+class PostBatch(APIView):
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    throttle_scope = 'list'
+    max_ids = 250
+
+    def get(self, request):
+        ids = self.get_ids()
+        user = request.user
+        visible = Q(status='published', published_at__lte=timezone.now())
+        if user.is_authenticated:
+            visible |= Q(author=user)
+        queryset = Post.objects.filter(visible, pk__in=ids)
+
+        # Hidden posts are reported as missing, as PostDetail answers 404
+        # for them, so the response does not reveal which ids exist.
+        renderer = request.accepted_renderer
+        context = {'request': request}
+        if isinstance(renderer, JSONRenderer) and renderer.can_splice(
+            request.accepted_media_type, {}
+        ):
+            rows = {
+                row[0]: row for row in queryset.values_list(*FRAGMENT_FIELDS)
+            }
+            found = [pk for pk in ids if pk in rows]
+            results = get_post_fragments(
+                [rows[pk] for pk in found], PostSerializer, context, renderer
+            )
+        else:
+            posts = queryset.select_related('author').prefetch_related('tags')
+            posts = {post.pk: post for post in posts}
+            found = [pk for pk in ids if pk in posts]
+            results = PostSerializer(
+                [posts[pk] for pk in found], many=True, context=context
+            ).data
+
+        found = set(found)
+        return Response(
+            {
+                'missing': [pk for pk in ids if pk not in found],
+                'results': results,
+            }
+        )
+
+    def get_ids(self):
+        ids = []
+        for value in self.request.query_params.get('ids', '').split(','):
+            if not (value := value.strip()):
+                continue
+            try:
+                ids.append(int(value))
+            except ValueError:
+                raise ValidationError(
+                    {'ids': f'Invalid id {value!r}. Expected integers.'}
+                )
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            raise ValidationError({'ids': 'This parameter is required.'})
+        if len(ids) > self.max_ids:
+            raise ValidationError(
+                {'ids': f'At most {self.max_ids} ids can be fetched at once.'}
+            )
+        return ids
+
+
 class PostDetail(generics.RetrieveUpdateDestroyAPIView):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [IsOwnerOrReadOnly]
+    throttle_scope = 'detail'
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        get_view_counter().increment(int(self.kwargs['pk']))
+        return response
 
     def get_object(self):
         user = self.request.user
@@ -163,3 +391,34 @@ class PostDetail(generics.RetrieveUpdateDestroyAPIView):
             )
 
         return obj
+
+
+class RelatedPostList(generics.ListAPIView):
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = None
+    throttle_scope = 'list'
+
+    def get_queryset(self):
+        user = self.request.user
+        visible = Q(status='published', published_at__lte=timezone.now())
+        if user.is_authenticated:
+            visible |= Q(author=user)
+        post = get_object_or_404(
+            Post.objects.filter(visible), pk=self.kwargs['pk']
+        )
+
+        neighbors = (
+            RelatedPost.objects.filter(
+                post=post,
+                related__status='published',
+                related__published_at__lte=timezone.now(),
+            )
+            .select_related('related__author')
+            .prefetch_related('related__tags')
+            .order_by('-shared_tags', '-related__published_at', '-related')
+        )
+        return [
+            neighbor.related
+            for neighbor in neighbors[: settings.BLOG_RELATED_POSTS]
+        ]
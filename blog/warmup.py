@@ -0,0 +1,70 @@
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.http import HttpRequest
+from django.test import RequestFactory
+from django.urls import get_resolver
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .counters import get_view_counter
+from .events import get_event_transport
+from .fragments import FRAGMENT_FIELDS
+from .models import Tag
+from .rendering import render_markdown
+from .serializers import PostSerializer, TagSerializer
+from .throttling import get_throttle_backend
+from .views import PostList
+
+
+def warm_caches():
+    # Safe in AppConfig.ready and before forking: touches no database.
+    resolver = get_resolver()
+    resolver.reverse_dict
+    resolver.url_patterns
+
+    for setting in (
+        'DEFAULT_RENDERER_CLASSES',
+        'DEFAULT_PARSER_CLASSES',
+        'DEFAULT_AUTHENTICATION_CLASSES',
+        'DEFAULT_PERMISSION_CLASSES',
+        'DEFAULT_THROTTLE_CLASSES',
+        'DEFAULT_PAGINATION_CLASS',
+    ):
+        getattr(api_settings, setting)
+
+    for method in ('GET', 'POST'):
+        request = HttpRequest()
+        request.method = method
+        context = {'request': Request(request)}
+        PostSerializer(context=context).fields
+        TagSerializer(context=context).fields
+
+    get_throttle_backend()
+    get_view_counter()
+    get_event_transport()
+    render_markdown('*warm*')
+
+
+def warm_connections():
+    # Run in each worker after forking (e.g. gunicorn's post_worker_init):
+    # opens the connection (and pool) of every database, then runs the
+    # statements of the anonymous list pages once. That loads the
+    # connection's type adapters and pulls the hot tables and indexes into
+    # the buffer cache; with OPTIONS['prepare_threshold'] = 0 psycopg also
+    # prepares the statements on the server.
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+    request = Request(RequestFactory().get('/'))
+    request.user = AnonymousUser()
+    view = PostList(request=request, kwargs={}, format_kwarg=None)
+    queryset = view.get_queryset()
+    page_size = api_settings.PAGE_SIZE or 10
+    list(queryset.values_list(*FRAGMENT_FIELDS)[:page_size])
+    queryset.count()
+    list(Tag.objects.all()[:page_size])
+
+
+def warm_up():
+    warm_caches()
+    warm_connections()
@@ -22,11 +22,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -58,6 +60,7 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        'OPTIONS': {'pool': config('DB_POOL', default=False, cast=bool)},
     }
 }
 
@@ -85,7 +88,120 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Render and parse API JSON with orjson instead of the stdlib json module.
+FAST_JSON = config('FAST_JSON', default=False, cast=bool)
+
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'blog.pagination.CachedCountPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'blog.renderers.ORJSONRenderer'
+        if FAST_JSON
+        else 'blog.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'blog.renderers.ORJSONParser'
+        if FAST_JSON
+        else 'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'blog.authentication.SignedTokenAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': ['blog.throttling.SlidingWindowThrottle'],
+    'DEFAULT_THROTTLE_RATES': {
+        'list': config('THROTTLE_LIST_RATE', default='60/min'),
+        'detail': config('THROTTLE_DETAIL_RATE', default='120/min'),
+        'write': config('THROTTLE_WRITE_RATE', default='30/min'),
+    },
 }
+
+# Use 'blog.throttling.CacheBackend' to share throttle counters between
+# processes and nodes through the default cache.
+BLOG_THROTTLE_BACKEND = config(
+    'BLOG_THROTTLE_BACKEND', default='blog.throttling.LocalBackend'
+)
+
+# Bearer tokens are signed with SECRET_KEY; list the previous key in
+# SECRET_KEY_FALLBACKS while rotating it so issued tokens stay valid.
+BLOG_TOKEN_MAX_AGE = config('BLOG_TOKEN_MAX_AGE', default=900, cast=int)
+BLOG_TOKEN_USER_CACHE_TTL = 60
+BLOG_TOKEN_USER_CACHE_SIZE = 1024
+
+# Rendered JSON of each post is cached per (id, updated_at) for list pages.
+BLOG_POST_FRAGMENT_TIMEOUT = 60 * 60
+
+# Related posts returned by /posts/<pk>/related/, and neighbors stored per
+# post in the precomputed table (kept larger to survive visibility filters).
+BLOG_RELATED_POSTS = 5
+BLOG_RELATED_POSTS_STORED = 50
+
+# Feeds list this many posts and are cached until the next post change.
+BLOG_FEED_ITEMS = 20
+BLOG_FEED_TIMEOUT = 24 * 60 * 60
+BLOG_FEED_MAX_AGE = 5 * 60
+
+# The change feed holds back changes younger than this many seconds, so a
+# transaction that commits late cannot land behind a consumer's cursor.
+BLOG_CHANGES_LAG = config('BLOG_CHANGES_LAG', default=5, cast=int)
+
+# Post events for /posts/events/ (served under ASGI). LocalTransport only
+# reaches subscribers in the publishing process; use
+# blog.events.PostgresTransport to fan out across workers with
+# LISTEN/NOTIFY.
+BLOG_EVENTS_TRANSPORT = config(
+    'BLOG_EVENTS_TRANSPORT', default='blog.events.LocalTransport'
+)
+BLOG_EVENTS_CHANNEL = 'blog_posts'
+BLOG_EVENTS_KEEPALIVE = 15
+BLOG_EVENTS_QUEUE_SIZE = 100
+
+# Post view counts are buffered per process (LocalViewCounter) or in the
+# shared cache (blog.counters.CacheViewCounter) and written in one batch
+# every BLOG_VIEW_FLUSH_INTERVAL seconds.
+BLOG_VIEW_COUNTER = config(
+    'BLOG_VIEW_COUNTER', default='blog.counters.LocalViewCounter'
+)
+BLOG_VIEW_FLUSH_INTERVAL = 10
+
+# Values returned per facet by /posts/?facets=tags,authors,months.
+BLOG_FACET_LIMIT = 20
+
+# Build URL resolvers, DRF settings and serializer fields in
+# AppConfig.ready instead of on the first request. Database connections
+# must not be opened before a server forks, so call
+# blog.warmup.warm_connections() from the server's post-fork hook.
+BLOG_WARM_UP = config('BLOG_WARM_UP', default=False, cast=bool)
+
+# Prometheus metrics served at /metrics. LocalMetrics reports this process
+# only; with several worker processes use blog.metrics.FileMetrics, which
+# shares snapshots through BLOG_METRICS_DIR (required; a directory local
+# to the host, emptied when the server starts). Set BLOG_METRICS_TOKEN to
+# require "Authorization: Bearer <token>" from the scraper; without it,
+# metrics are only served to staff users and to unproxied requests from
+# loopback.
+BLOG_METRICS = config('BLOG_METRICS', default='blog.metrics.LocalMetrics')
+BLOG_METRICS_DIR = config('BLOG_METRICS_DIR', default='')
+BLOG_METRICS_WRITE_INTERVAL = 5
+BLOG_METRICS_TOKEN = config('BLOG_METRICS_TOKEN', default='')
+
+# Staff requests sent with an X-Profile header or ?profile= flag are
+# profiled and saved here, browsable under /admin/profiles/. Only the
+# newest BLOG_PROFILE_KEEP profiles are kept.
+BLOG_PROFILE_DIR = config('BLOG_PROFILE_DIR', default=BASE_DIR / 'profiles')
+BLOG_PROFILE_KEEP = 100
+BLOG_PROFILE_SAMPLE_INTERVAL = 0.001
+
+# Side effects of post and tag writes that can touch many rows (related
+# posts, renamed tags and authors) are queued in the database and run by
+# `manage.py run_tasks`. With BLOG_TASKS_EAGER they run inline instead,
+# for development without a worker.
+BLOG_TASKS_EAGER = config('BLOG_TASKS_EAGER', default=False, cast=bool)
+BLOG_TASK_LEASE = 5 * 60
+BLOG_TASK_MAX_ATTEMPTS = 5
+BLOG_TASK_RETRY_DELAY = 10
+BLOG_TASK_POLL_INTERVAL = 1
@@ -1,7 +1,21 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from blog.admin import profile_detail, profile_list
+from blog.metrics import metrics
+
 urlpatterns = [
+    path(
+        'admin/profiles/',
+        admin.site.admin_view(profile_list),
+        name='profile-list',
+    ),
+    path(
+        'admin/profiles/<slug:profile_id>/',
+        admin.site.admin_view(profile_detail),
+        name='profile-detail',
+    ),
     path('admin/', admin.site.urls),
     path('api/v1/', include('blog.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
@@ -1,13 +1,36 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.utils import timezone
 from rest_framework.test import APIClient
 
+from blog.counters import get_view_counter
+from blog.metrics import get_metrics
 from blog.models import Post, Tag
+from blog.throttling import get_throttle_backend
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def reset_throttles():
+    get_throttle_backend.cache_clear()
+    get_view_counter.cache_clear()
+    get_metrics.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def eager_tasks(settings):
+    # Tests of the queue itself turn this off.
+    settings.BLOG_TASKS_EAGER = True
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
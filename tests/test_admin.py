@@ -0,0 +1,64 @@
+import pytest
+from django.urls import reverse
+
+from blog import pagination
+from blog.models import Post
+from blog.pagination import EstimatedCountPaginator
+
+
+@pytest.mark.django_db
+class TestPostAdmin:
+    def test_changelist_full_text_search(
+        self, admin_client, published_post, published_post_by_another_user
+    ):
+        """Test that the changelist search matches title and content words."""
+        url = reverse('admin:blog_post_changelist')
+        response = admin_client.get(url, {'q': 'another'})
+
+        assert response.status_code == 200
+        assert list(response.context['cl'].result_list) == [
+            published_post_by_another_user
+        ]
+
+    def test_changelist_author_and_tag_filters(
+        self,
+        admin_client,
+        user,
+        tag_python,
+        published_post,
+        published_post_by_another_user,
+    ):
+        """Test that the author and tag input filters narrow the changelist."""
+        published_post.tags.add(tag_python)
+        url = reverse('admin:blog_post_changelist')
+        response = admin_client.get(
+            url, {'author': user.username, 'tag': tag_python.name}
+        )
+
+        assert response.status_code == 200
+        assert list(response.context['cl'].result_list) == [published_post]
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+    def test_unfiltered_count_uses_table_estimate(
+        self, monkeypatch, published_post
+    ):
+        """Test that large unfiltered tables are counted from statistics."""
+        monkeypatch.setattr(
+            pagination, 'estimated_table_count', lambda model, using: 500_000
+        )
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+
+        assert paginator.count == 500_000
+
+    def test_filtered_count_is_exact(self, monkeypatch, published_post):
+        """Test that filtered querysets keep an exact count."""
+        monkeypatch.setattr(
+            pagination, 'estimated_table_count', lambda model, using: 500_000
+        )
+        paginator = EstimatedCountPaginator(
+            Post.objects.filter(status='published'), 10
+        )
+
+        assert paginator.count == 1
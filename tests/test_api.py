@@ -2,6 +2,8 @@ from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 
+from blog.models import Post, Tag
+
 
 class TestPostList:
     def test_anonymous_user_sees_only_published_posts(
@@ -41,6 +43,23 @@ class TestPostList:
         }
         assert returned_ids == expected_ids
 
+    def test_content_html_is_only_returned_when_included(
+        self, api_client, published_post
+    ):
+        """Test that the rendered HTML is an opt-in field."""
+        url = reverse('post-list')
+        response = api_client.get(url)
+
+        assert 'content_html' not in response.data['results'][0]
+
+        response = api_client.get(url + '?include=content_html')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert (
+            response.data['results'][0]['content_html']
+            == '<p>Published content</p>'
+        )
+
     def test_anonymous_user_cannot_create_post(self, api_client):
         """Test that an anonymous user cannot create a post."""
         url = reverse('post-list')
@@ -69,6 +88,38 @@ class TestPostList:
         assert tag_python.id in tag_ids
         assert tag_django.id in tag_ids
 
+    def test_tags_can_be_given_by_name(
+        self, api_client, user, tag_python, tag_django
+    ):
+        """Test that tags are resolved by id or name and missing names are created."""
+        api_client.force_authenticate(user=user)
+        url = reverse('post-list')
+        data = {
+            'title': 'New Post',
+            'content': 'Content of the new post',
+            'tags': [tag_python.id, 'DJANGO', 'asyncio'],
+        }
+        response = api_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        post = Post.objects.get(pk=response.data['id'])
+        assert sorted(post.tags.values_list('name', flat=True)) == [
+            'Django',
+            'asyncio',
+            'python',
+        ]
+        assert Tag.objects.count() == 3
+
+    def test_unknown_tag_id_is_rejected(self, api_client, user):
+        """Test that a tag id that does not exist is a validation error."""
+        api_client.force_authenticate(user=user)
+        url = reverse('post-list')
+        data = {'title': 'New Post', 'content': 'Content', 'tags': [999999]}
+        response = api_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'does not exist' in str(response.data['tags'])
+
     def test_posts_are_ordered_by_ownership_then_status_then_published_at_desc(
         self,
         api_client,
@@ -354,6 +405,28 @@ class TestPostDetail:
         assert response.data['content'] == data['content']
         assert response.data['author'] == user.username
 
+    def test_tag_update_only_changes_the_difference(
+        self, api_client, user, published_post, tag_python, tag_django
+    ):
+        """Test that updating tags keeps the links that did not change."""
+        published_post.tags.add(tag_python, tag_django)
+        kept = Post.tags.through.objects.get(
+            post=published_post, tag=tag_python
+        )
+        api_client.force_authenticate(user=user)
+        url = reverse('post-detail', args=[published_post.id])
+        response = api_client.patch(
+            url, {'tags': ['python', 'asyncio']}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        links = Post.tags.through.objects.filter(post=published_post)
+        assert sorted(links.values_list('tag__name', flat=True)) == [
+            'asyncio',
+            'python',
+        ]
+        assert links.filter(pk=kept.pk).exists()
+
     def test_authenticated_user_cannot_update_others_post(
         self, api_client, user, published_post_by_another_user
     ):
@@ -0,0 +1,105 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from blog.authentication import issue_token
+
+
+@pytest.mark.django_db
+class TestSignedTokenAuthentication:
+    def test_token_is_issued_for_valid_credentials(self, api_client, user):
+        """Test that valid credentials are exchanged for a bearer token."""
+        url = reverse('token-obtain')
+        data = {'username': user.username, 'password': 'password'}
+        response = api_client.post(url, data)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['token']
+
+    def test_token_is_not_issued_for_invalid_credentials(
+        self, api_client, user
+    ):
+        """Test that invalid credentials are rejected."""
+        url = reverse('token-obtain')
+        data = {'username': user.username, 'password': 'wrong'}
+        response = api_client.post(url, data)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_bearer_token_authenticates_writes(self, api_client, user):
+        """Test that a bearer token authenticates the request."""
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {issue_token(user)}'
+        )
+        url = reverse('post-list')
+        data = {'title': 'Token Post', 'content': 'Content'}
+        response = api_client.post(url, data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['author'] == user.username
+
+    def test_cached_user_skips_user_and_session_lookups(
+        self, api_client, user
+    ):
+        """Test that repeated requests resolve the user from the cache."""
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {issue_token(user)}'
+        )
+        url = reverse('tag-list')
+        api_client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not any(
+            'auth_user' in query['sql'] or 'django_session' in query['sql']
+            for query in queries.captured_queries
+        )
+
+    def test_expired_token_is_rejected(self, api_client, user, settings):
+        """Test that tokens older than the maximum age are rejected."""
+        settings.BLOG_TOKEN_MAX_AGE = -1
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {issue_token(user)}'
+        )
+        response = api_client.get(reverse('post-list'))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert 'expired' in str(response.data['detail'])
+
+    def test_password_change_revokes_token(self, api_client, user):
+        """Test that changing the password invalidates issued tokens."""
+        token = issue_token(user)
+        user.set_password('new-password')
+        user.save()
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = api_client.get(reverse('post-list'))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_token_can_be_refreshed(self, api_client, user):
+        """Test that a valid token can be rotated for a new one."""
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {issue_token(user)}'
+        )
+        response = api_client.post(reverse('token-refresh'))
+
+        assert response.status_code == status.HTTP_200_OK
+
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.data["token"]}'
+        )
+        data = {'title': 'Refreshed', 'content': 'Content'}
+        response = api_client.post(reverse('post-list'), data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_refresh_requires_a_token(self, api_client):
+        """Test that refreshing without a token is unauthorized."""
+        response = api_client.post(reverse('token-refresh'))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
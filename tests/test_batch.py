@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from blog.views import PostBatch
+
+
+def get_batch(api_client, ids, **extra):
+    ids = ','.join(str(pk) for pk in ids)
+    return api_client.get(f'{reverse("post-batch")}?ids={ids}', **extra)
+
+
+@pytest.mark.django_db
+class TestPostBatch:
+    def test_posts_are_returned_in_requested_order(
+        self, api_client, published_post, published_post_by_another_user
+    ):
+        """Test that results follow the order of the requested ids."""
+        ids = [published_post_by_another_user.pk, published_post.pk]
+
+        response = get_batch(api_client, ids)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [post['id'] for post in response.data['results']] == ids
+        assert response.data['missing'] == []
+
+    def test_missing_and_hidden_ids_are_reported(
+        self,
+        api_client,
+        published_post,
+        draft_post,
+        draft_post_by_another_user,
+    ):
+        """Test that unknown and invisible ids are listed as missing."""
+        api_client.force_authenticate(draft_post.author)
+        ids = [draft_post_by_another_user.pk, published_post.pk, 0]
+
+        response = get_batch(api_client, [*ids, draft_post.pk])
+
+        assert [post['id'] for post in response.data['results']] == [
+            published_post.pk,
+            draft_post.pk,
+        ]
+        assert response.data['missing'] == [draft_post_by_another_user.pk, 0]
+
+    def test_posts_are_fetched_in_one_query(
+        self,
+        api_client,
+        published_post,
+        published_post_by_another_user,
+        tag_python,
+    ):
+        """Test that cached posts cost a single visibility-filtered query."""
+        published_post.tags.add(tag_python)
+        ids = [published_post.pk, published_post_by_another_user.pk]
+        get_batch(api_client, ids)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = get_batch(api_client, ids)
+
+        assert len(response.data['results']) == 2
+        assert len(queries) == 1
+
+    def test_browsable_api_matches_json(
+        self, api_client, published_post, published_post_by_another_user
+    ):
+        """Test that the serializer fallback returns the same posts."""
+        ids = [published_post_by_another_user.pk, published_post.pk]
+
+        json_results = get_batch(api_client, ids).data['results']
+        html_results = get_batch(
+            api_client, ids, HTTP_ACCEPT='text/html'
+        ).data['results']
+
+        assert list(json_results) == list(html_results)
+
+    @pytest.mark.parametrize(
+        'ids',
+        ['', '1,x', ','.join(str(pk) for pk in range(PostBatch.max_ids + 1))],
+    )
+    def test_invalid_ids_are_rejected(self, api_client, ids):
+        """Test that empty, malformed or oversized id lists fail."""
+        response = api_client.get(reverse('post-batch'), {'ids': ids})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'ids' in response.data
@@ -0,0 +1,116 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from blog.changes import decode_cursor, encode_cursor
+
+
+@pytest.fixture(autouse=True)
+def no_changes_lag(settings):
+    settings.BLOG_CHANGES_LAG = 0
+
+
+@pytest.mark.django_db
+class TestPostChanges:
+    def get_changes(self, api_client, **params):
+        response = api_client.get(reverse('post-changes'), params)
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+
+    def test_changes_are_ordered_by_update_time(
+        self, api_client, published_post, published_post_by_another_user
+    ):
+        """Test that changed posts are listed oldest change first."""
+        published_post.title = 'Edited Post'
+        published_post.save()
+
+        data = self.get_changes(api_client)
+
+        assert [change['id'] for change in data['results']] == [
+            published_post_by_another_user.pk,
+            published_post.pk,
+        ]
+        assert data['results'][1]['post']['title'] == 'Edited Post'
+        assert data['has_more'] is False
+
+    def test_cursor_returns_only_later_changes(
+        self, api_client, published_post, published_post_by_another_user
+    ):
+        """Test that a cursor resumes after the last change seen."""
+        first = self.get_changes(api_client, limit=1)
+        second = self.get_changes(api_client, since=first['cursor'])
+        caught_up = self.get_changes(api_client, since=second['cursor'])
+
+        assert first['has_more'] is True
+        assert [change['id'] for change in second['results']] == [
+            published_post_by_another_user.pk
+        ]
+        assert caught_up['results'] == []
+        assert caught_up['cursor'] == second['cursor']
+
+    def test_deleted_and_unpublished_posts_are_tombstones(
+        self, api_client, published_post, published_post_by_another_user
+    ):
+        """Test that removed and unpublished posts are reported deleted."""
+        cursor = self.get_changes(api_client)['cursor']
+        deleted_pk = published_post.pk
+        published_post.delete()
+        published_post_by_another_user.status = 'draft'
+        published_post_by_another_user.published_at = None
+        published_post_by_another_user.save()
+
+        data = self.get_changes(api_client, since=cursor)
+
+        assert [
+            (change['id'], change['deleted'], change['post'])
+            for change in data['results']
+        ] == [
+            (deleted_pk, True, None),
+            (published_post_by_another_user.pk, True, None),
+        ]
+
+    def test_draft_edits_never_reach_the_feed(self, api_client, draft_post):
+        """Test that changes to a draft are invisible to anonymous users."""
+        draft_post.title = 'Edited Draft'
+        draft_post.save()
+
+        assert self.get_changes(api_client)['results'] == []
+
+    def test_deleted_drafts_leave_no_tombstone(
+        self, api_client, user, published_post, draft_post
+    ):
+        """Test that only posts that were public are reported deleted."""
+        cursor = self.get_changes(api_client)['cursor']
+        deleted_pk = published_post.pk
+        published_post.delete()
+        draft_post.delete()
+
+        anonymous = self.get_changes(api_client, since=cursor)
+        api_client.force_authenticate(user)
+        authenticated = self.get_changes(api_client, since=cursor)
+
+        for data in (anonymous, authenticated):
+            assert [change['id'] for change in data['results']] == [deleted_pk]
+
+    def test_recent_changes_are_held_back(
+        self, api_client, settings, published_post
+    ):
+        """Test that changes inside the lag window are not listed yet."""
+        settings.BLOG_CHANGES_LAG = 60
+
+        assert self.get_changes(api_client)['results'] == []
+
+    def test_invalid_cursor_is_rejected(self, api_client):
+        """Test that a malformed cursor is a validation error."""
+        response = api_client.get(reverse('post-changes'), {'since': 'nope'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_cursor_round_trip(self, published_post):
+        """Test that cursors decode to the position they encode."""
+        cursor = encode_cursor(published_post.updated_at, published_post.pk)
+
+        assert decode_cursor(cursor) == (
+            published_post.updated_at,
+            published_post.pk,
+        )
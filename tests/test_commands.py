@@ -0,0 +1,306 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.urls import reverse
+
+from blog.management.commands.import_posts import CREATE_STAGING
+from blog.models import Post, RelatedPost, Tag
+from blog.rendering import RENDERER_VERSION
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestRenderPostsCommand:
+    def test_outdated_posts_are_re_rendered(self, published_post, draft_post):
+        """Test that posts rendered by an older renderer are re-rendered."""
+        Post.objects.filter(pk=draft_post.pk).update(
+            content_html='', content_html_version=0
+        )
+
+        out = StringIO()
+        call_command('render_posts', workers=2, stdout=out)
+
+        draft_post.refresh_from_db()
+        assert draft_post.content_html == '<p>Draft content</p>'
+        assert draft_post.content_html_version == RENDERER_VERSION
+        assert 'Rendered 1 posts' in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestSeedBlogCommand:
+    def test_dataset_is_generated_with_requested_sizes(self):
+        """Test that users, tags, posts and tag links are loaded."""
+        call_command(
+            'seed_blog',
+            users=5,
+            tags=10,
+            posts=120,
+            batch_size=50,
+            draft_ratio=0,
+            seed=1,
+            workers=1,
+            stdout=StringIO(),
+        )
+
+        assert (
+            User.objects.filter(username__startswith='seed-user-').count() == 5
+        )
+        assert Tag.objects.count() == 10
+        assert Post.objects.filter(status='published').count() == 120
+        assert Post.tags.through.objects.exists()
+
+    def test_draft_ratio_controls_unpublished_posts(self):
+        """Test that a draft ratio of one produces only drafts."""
+        call_command(
+            'seed_blog',
+            users=1,
+            tags=0,
+            posts=10,
+            draft_ratio=1,
+            workers=1,
+            stdout=StringIO(),
+        )
+
+        assert not Post.objects.filter(published_at__isnull=False).exists()
+        assert Post.objects.filter(status='draft').count() == 10
+
+
+@pytest.mark.django_db
+class TestRebuildRelatedCommand:
+    def test_neighbor_lists_are_rebuilt(
+        self, published_post, published_post_by_another_user, tag_python
+    ):
+        """Test that stale related-post lists are replaced."""
+        published_post.tags.add(tag_python)
+        published_post_by_another_user.tags.add(tag_python)
+        RelatedPost.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_related', workers=1, batch_size=1, stdout=out)
+
+        assert set(
+            RelatedPost.objects.values_list('post', 'related', 'shared_tags')
+        ) == {
+            (published_post.pk, published_post_by_another_user.pk, 1),
+            (published_post_by_another_user.pk, published_post.pk, 1),
+        }
+        assert 'Stored 2 related-post links' in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestExportImportPostsCommands:
+    @pytest.mark.parametrize('extension', ['jsonl', 'csv'])
+    def test_round_trip_creates_posts_tags_and_authors(
+        self, tmp_path, published_post, draft_post, tag_python, extension
+    ):
+        """Test that exported posts can be imported into an empty blog."""
+        published_post.tags.add(tag_python)
+        path = tmp_path / f'posts.{extension}'
+        call_command('export_posts', str(path), stderr=StringIO())
+
+        Post.objects.all().delete()
+        Tag.objects.all().delete()
+        User.objects.all().delete()
+        call_command(
+            'import_posts', str(path), create_authors=True, stdout=StringIO()
+        )
+
+        post = Post.objects.get(slug=published_post.slug)
+        assert post.author.username == published_post.author.username
+        assert post.published_at == published_post.published_at
+        assert list(post.tags.values_list('name', flat=True)) == ['python']
+        assert Post.objects.get(slug=draft_post.slug).status == 'draft'
+
+    def test_import_retires_cached_feeds(self, client, tmp_path, user):
+        """Test that imported posts show up in an already cached feed."""
+        client.get(reverse('post-feed'))
+        path = tmp_path / 'posts.jsonl'
+        path.write_text(
+            '{"title": "Imported", "content": "C", "author": "testuser", '
+            '"status": "published", "published_at": "2024-01-01T00:00:00Z"}\n'
+        )
+
+        call_command('import_posts', str(path), stdout=StringIO())
+
+        assert b'Imported' in client.get(reverse('post-feed')).content
+
+    def test_unknown_authors_fail_without_create_flag(self, tmp_path):
+        """Test that importing posts by unknown users is refused."""
+        path = tmp_path / 'posts.jsonl'
+        path.write_text('{"title": "T", "content": "C", "author": "ghost"}\n')
+
+        with pytest.raises(CommandError, match='ghost'):
+            call_command('import_posts', str(path), stdout=StringIO())
+
+    def test_existing_slug_is_updated_by_default(self, tmp_path, user):
+        """Test that an imported post replaces the post with its slug."""
+        Post.objects.create(
+            title='Old', slug='same', content='old', author=user
+        )
+        path = tmp_path / 'posts.jsonl'
+        path.write_text(
+            '{"title": "New", "slug": "same", "content": "new", '
+            '"author": "testuser"}\n'
+        )
+
+        call_command('import_posts', str(path), stdout=StringIO())
+
+        post = Post.objects.get(slug='same')
+        assert post.title == 'New'
+        assert post.content_html_version == 0
+
+    def test_existing_slug_is_renamed_on_request(self, tmp_path, user):
+        """Test that colliding slugs get a suffix in rename mode."""
+        Post.objects.create(
+            title='Old', slug='same', content='old', author=user
+        )
+        path = tmp_path / 'posts.jsonl'
+        path.write_text(
+            '{"title": "New", "slug": "same", "content": "new", '
+            '"author": "testuser"}\n'
+        )
+
+        call_command(
+            'import_posts', str(path), on_conflict='rename', stdout=StringIO()
+        )
+
+        assert Post.objects.get(slug='same').title == 'Old'
+        assert Post.objects.get(slug='same-1').title == 'New'
+
+    def test_derived_slugs_do_not_collapse_records(self, tmp_path, user):
+        """Test that titles deriving one slug import as separate posts."""
+        path = tmp_path / 'posts.jsonl'
+        path.write_text(
+            '{"title": "Hello, World", "content": "A", "author": "testuser"}\n'
+            '{"title": "Hello World!", "content": "B", "author": "testuser"}\n'
+        )
+
+        call_command('import_posts', str(path), stdout=StringIO())
+
+        assert dict(Post.objects.values_list('slug', 'content')) == {
+            'hello-world': 'A',
+            'hello-world-2': 'B',
+        }
+
+    def test_derived_slug_does_not_update_an_existing_post(
+        self, tmp_path, user, another_user, tag_python
+    ):
+        """Test that a title matching an existing slug imports a new post."""
+        existing = Post.objects.create(
+            title='Hello World', slug='hello-world', content='A', author=user
+        )
+        existing.tags.add(tag_python)
+        path = tmp_path / 'posts.jsonl'
+        path.write_text(
+            '{"title": "Hello World", "content": "B", "author": "otheruser"}\n'
+        )
+
+        call_command('import_posts', str(path), stdout=StringIO())
+
+        existing.refresh_from_db()
+        assert (existing.content, existing.author) == ('A', user)
+        assert list(existing.tags.all()) == [tag_python]
+        assert Post.objects.get(slug='hello-world-1').content == 'B'
+
+    @pytest.mark.parametrize('on_conflict', ['update', 'rename'])
+    def test_suffixed_slug_skips_slugs_already_taken(
+        self, tmp_path, user, tag_python, on_conflict
+    ):
+        """Test that a suffix owned by another post is not reused."""
+        Post.objects.create(
+            title='Hello World', slug='hello-world', content='A', author=user
+        )
+        owner = Post.objects.create(
+            title='Other', slug='hello-world-1', content='O', author=user
+        )
+        owner.tags.add(tag_python)
+        path = tmp_path / 'posts.jsonl'
+        path.write_text(
+            '{"title": "Hello World", "content": "B", "author": "testuser", '
+            '"tags": ["django"]}\n'
+        )
+
+        call_command(
+            'import_posts',
+            str(path),
+            on_conflict=on_conflict,
+            stdout=StringIO(),
+        )
+
+        owner.refresh_from_db()
+        assert (owner.title, owner.content) == ('Other', 'O')
+        assert list(owner.tags.values_list('name', flat=True)) == ['python']
+        imported = Post.objects.get(content='B')
+        assert imported.slug not in ('hello-world', 'hello-world-1')
+        assert list(imported.tags.values_list('name', flat=True)) == ['django']
+
+    def test_stdin_is_left_open(self, monkeypatch, user):
+        """Test that importing from stdin does not close it."""
+        stdin = StringIO(
+            '{"title": "T", "content": "C", "author": "testuser"}\n'
+        )
+        monkeypatch.setattr('sys.stdin', stdin)
+
+        call_command('import_posts', '-', stdout=StringIO())
+
+        assert not stdin.closed
+        assert Post.objects.filter(title='T').exists()
+
+    def test_malformed_csv_tags_name_the_record(self, tmp_path, user):
+        """Test that an unparsable tags cell fails with its record number."""
+        path = tmp_path / 'posts.csv'
+        path.write_text(
+            'title,content,author,tags\n'
+            'A,C,testuser,[]\n'
+            'B,C,testuser,"[python"\n'
+        )
+
+        with pytest.raises(CommandError, match='Record 2: invalid tags'):
+            call_command('import_posts', str(path), stdout=StringIO())
+
+    def test_tags_match_existing_names_case_insensitively(
+        self, tmp_path, user, tag_python
+    ):
+        """Test that imported tag names reuse tags spelt differently."""
+        path = tmp_path / 'posts.jsonl'
+        path.write_text(
+            '{"title": "T", "content": "C", "author": "testuser", '
+            '"tags": ["Python", "New", "new"]}\n'
+        )
+
+        call_command('import_posts', str(path), stdout=StringIO())
+
+        post = Post.objects.get(title='T')
+        assert sorted(post.tags.values_list('name', flat=True)) == [
+            'New',
+            'python',
+        ]
+        assert Tag.objects.count() == 2
+
+    def test_interrupted_job_resumes_after_staged_records(
+        self, tmp_path, user
+    ):
+        """Test that records staged by an earlier run are not read again."""
+        path = tmp_path / 'posts.jsonl'
+        path.write_text(
+            'not json\n'
+            '{"title": "Second", "content": "C", "author": "testuser"}\n'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_STAGING.format(staging='blog_import_posts'))
+            cursor.execute(
+                'INSERT INTO blog_import_posts (seq, title, slug, content, '
+                "author, status, tags) VALUES (1, 'First', 'first', 'C', "
+                "'testuser', 'draft', '[]')"
+            )
+
+        call_command('import_posts', str(path), stdout=StringIO())
+
+        assert set(Post.objects.values_list('title', flat=True)) == {
+            'First',
+            'Second',
+        }
@@ -0,0 +1,142 @@
+import pytest
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from blog import counters
+from blog.counters import CacheViewCounter, LocalViewCounter
+from blog.models import Post
+
+
+def views_of(post):
+    return Post.objects.values_list('views', flat=True).get(pk=post.pk)
+
+
+def fail_flush(counts):
+    raise DatabaseError('database is down')
+
+
+@pytest.mark.django_db
+class TestLocalViewCounter:
+    def test_increments_are_buffered_until_flushed(
+        self, settings, published_post, published_post_by_another_user
+    ):
+        """Test that views are written in one batch on flush."""
+        settings.BLOG_VIEW_FLUSH_INTERVAL = 60
+        counter = LocalViewCounter()
+        for _ in range(3):
+            counter.increment(published_post.pk)
+        counter.increment(published_post_by_another_user.pk)
+
+        assert views_of(published_post) == 0
+
+        with CaptureQueriesContext(connection) as queries:
+            counter.flush()
+
+        assert len(queries) == 1
+        assert views_of(published_post) == 3
+        assert views_of(published_post_by_another_user) == 1
+
+    def test_flush_interval_triggers_a_flush(self, settings, published_post):
+        """Test that an increment past the interval flushes the buffer."""
+        settings.BLOG_VIEW_FLUSH_INTERVAL = 0
+        LocalViewCounter().increment(published_post.pk)
+
+        assert views_of(published_post) == 1
+
+    def test_failed_flush_keeps_counts_and_logs(
+        self, monkeypatch, settings, caplog, published_post
+    ):
+        """Test that a failed flush is logged and retried later."""
+        settings.BLOG_VIEW_FLUSH_INTERVAL = 0
+        counter = LocalViewCounter()
+        monkeypatch.setattr(counters, 'flush_counts', fail_flush)
+
+        counter.increment(published_post.pk)
+
+        assert 'Flushing post view counts failed.' in caplog.text
+        monkeypatch.undo()
+        counter.flush()
+        assert views_of(published_post) == 1
+
+
+@pytest.mark.django_db
+class TestCacheViewCounter:
+    def test_settled_generations_are_flushed(self, settings, published_post):
+        """Test that shared counts reach the database after rotation."""
+        settings.BLOG_VIEW_FLUSH_INTERVAL = 60
+        counter = CacheViewCounter()
+        counter.increment(published_post.pk)
+        counter.increment(published_post.pk)
+
+        counter.flush()
+        counter.flush()
+
+        assert views_of(published_post) == 2
+
+    def test_failed_flush_keeps_the_generation(
+        self, monkeypatch, settings, published_post
+    ):
+        """Test that counts survive a failed write of their generation."""
+        settings.BLOG_VIEW_FLUSH_INTERVAL = 60
+        counter = CacheViewCounter()
+        counter.increment(published_post.pk)
+        counter.flush()
+
+        monkeypatch.setattr(counters, 'flush_counts', fail_flush)
+        with pytest.raises(DatabaseError):
+            counter.flush()
+        monkeypatch.undo()
+        counter.flush()
+
+        assert views_of(published_post) == 1
+
+
+@pytest.mark.django_db
+class TestPostViews:
+    def test_detail_views_are_counted(
+        self, api_client, settings, published_post
+    ):
+        """Test that reading a post counts a view."""
+        settings.BLOG_VIEW_FLUSH_INTERVAL = 0
+        url = reverse('post-detail', args=[published_post.pk])
+        api_client.get(url)
+        response = api_client.get(url)
+
+        assert response.data['views'] == 1
+        assert views_of(published_post) == 2
+
+    def test_popular_ordering(
+        self, api_client, published_post, published_post_by_another_user
+    ):
+        """Test that ?ordering=-views lists the most viewed posts first."""
+        Post.objects.filter(pk=published_post_by_another_user.pk).update(
+            views=10
+        )
+        response = api_client.get(reverse('post-list'), {'ordering': '-views'})
+
+        assert [post['id'] for post in response.data['results']] == [
+            published_post_by_another_user.pk,
+            published_post.pk,
+        ]
+        assert response.data['results'][0]['views'] == 10
+
+    def test_unknown_ordering_is_rejected(self, api_client):
+        """Test that only the supported ordering is accepted."""
+        response = api_client.get(reverse('post-list'), {'ordering': 'title'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_failed_flush_does_not_fail_the_request(
+        self, api_client, monkeypatch, settings, published_post
+    ):
+        """Test that a post is served when flushing its views fails."""
+        settings.BLOG_VIEW_FLUSH_INTERVAL = 0
+        monkeypatch.setattr(counters, 'flush_counts', fail_flush)
+
+        response = api_client.get(
+            reverse('post-detail', args=[published_post.pk])
+        )
+
+        assert response.status_code == status.HTTP_200_OK
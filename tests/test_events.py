@@ -0,0 +1,198 @@
+import asyncio
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.test import AsyncClient
+from django.urls import reverse
+
+from blog import events, signals
+from blog.events import Broadcaster, LocalTransport, PostgresTransport
+
+
+class RecordingTransport:
+    def __init__(self):
+        self.events = []
+
+    def publish(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    transport = RecordingTransport()
+    monkeypatch.setattr(signals, 'get_event_transport', lambda: transport)
+    return transport
+
+
+@pytest.mark.django_db
+class TestPostEventHooks:
+    def test_public_post_changes_are_published(
+        self, transport, django_capture_on_commit_callbacks, published_post
+    ):
+        """Test that updates and deletes of public posts emit events."""
+        pk = published_post.pk
+        with django_capture_on_commit_callbacks(execute=True):
+            published_post.title = 'Edited Post'
+            published_post.save()
+            published_post.delete()
+
+        assert [
+            (event['type'], event['id']) for event in transport.events
+        ] == [
+            ('update', pk),
+            ('delete', pk),
+        ]
+        assert transport.events[0]['title'] == 'Edited Post'
+
+    def test_publishing_and_unpublishing_a_draft(
+        self, transport, django_capture_on_commit_callbacks, draft_post
+    ):
+        """Test that visibility changes emit publish and delete events."""
+        with django_capture_on_commit_callbacks(execute=True):
+            draft_post.save()
+            draft_post.status = 'published'
+            draft_post.published_at = draft_post.created_at
+            draft_post.save()
+            draft_post.status = 'draft'
+            draft_post.published_at = None
+            draft_post.save()
+
+        assert [event['type'] for event in transport.events] == [
+            'publish',
+            'delete',
+        ]
+
+    def test_rolled_back_changes_are_not_published(
+        self, transport, django_capture_on_commit_callbacks, published_post
+    ):
+        """Test that events wait for the transaction to commit."""
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            published_post.save()
+
+        assert len(callbacks) == 1
+        assert transport.events == []
+
+
+class TestBroadcaster:
+    def test_events_fan_out_to_every_subscriber(self, settings):
+        """Test that one transport listener feeds all subscribers."""
+        settings.BLOG_EVENTS_QUEUE_SIZE = 10
+        transport = LocalTransport()
+
+        async def scenario():
+            broadcaster = Broadcaster(transport)
+            first = broadcaster.subscribe(keepalive=1)
+            second = broadcaster.subscribe(keepalive=1)
+            pending = [
+                asyncio.ensure_future(anext(first)),
+                asyncio.ensure_future(anext(second)),
+            ]
+            while not transport.listeners:
+                await asyncio.sleep(0)
+            transport.publish({'type': 'publish', 'id': 1})
+            received = await asyncio.gather(*pending)
+            await first.aclose()
+            await second.aclose()
+            return received, broadcaster
+
+        received, broadcaster = asyncio.run(scenario())
+
+        assert received == [{'type': 'publish', 'id': 1}] * 2
+        assert broadcaster.listener is None
+        assert transport.listeners == set()
+
+    def test_slow_subscriber_is_dropped(self, settings):
+        """Test that a full queue ends the subscriber's stream."""
+        settings.BLOG_EVENTS_QUEUE_SIZE = 1
+        transport = LocalTransport()
+
+        async def scenario():
+            broadcaster = Broadcaster(transport)
+            stream = broadcaster.subscribe(keepalive=1)
+            first = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0)
+            broadcaster.dispatch({'id': 1})
+            broadcaster.dispatch({'id': 2})
+            broadcaster.dispatch({'id': 3})
+            return [await first] + [event async for event in stream]
+
+        assert asyncio.run(scenario()) == [{'id': 1}]
+
+    def test_stream_sends_server_sent_events(self, monkeypatch, settings):
+        """Test that the endpoint streams events in SSE format."""
+        settings.BLOG_EVENTS_QUEUE_SIZE = 10
+        transport = LocalTransport()
+        monkeypatch.setattr(events, 'get_event_transport', lambda: transport)
+
+        async def scenario():
+            response = await AsyncClient().get(reverse('post-events'))
+            chunks = aiter(response.streaming_content)
+            retry = await anext(chunks)
+            pending = asyncio.ensure_future(anext(chunks))
+            while not transport.listeners:
+                await asyncio.sleep(0)
+            transport.publish({'type': 'publish', 'id': 7, 'cursor': 'abc'})
+            event = await pending
+            await response.streaming_content.aclose()
+            return response, retry, event
+
+        response, retry, event = asyncio.run(scenario())
+
+        assert response['Content-Type'] == 'text/event-stream'
+        assert retry == b'retry: 3000\n\n'
+        assert event == (
+            b'id: abc\nevent: publish\n'
+            b'data: {"type": "publish", "id": 7, "cursor": "abc"}\n\n'
+        )
+
+    def test_stream_is_refused_outside_asgi(self, client):
+        """Test that a WSGI request gets a 501 instead of a stream."""
+        response = client.get(reverse('post-events'))
+
+        assert response.status_code == 501
+        assert not response.streaming
+
+    def test_failed_listener_is_logged(self, caplog):
+        """Test that a crashed transport is logged and can be restarted."""
+
+        class BrokenTransport:
+            async def listen(self, dispatch):
+                raise RuntimeError('boom')
+
+        async def scenario():
+            broadcaster = Broadcaster(BrokenTransport())
+            stream = broadcaster.subscribe(keepalive=0.01)
+            assert await anext(stream) is None
+            await stream.aclose()
+            return broadcaster
+
+        broadcaster = asyncio.run(scenario())
+
+        assert broadcaster.listener is None
+        assert 'Event transport stopped listening.' in caplog.text
+        assert 'boom' in caplog.text
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostgresTransport:
+    def test_notifications_reach_listeners(self):
+        """Test that published events arrive through LISTEN/NOTIFY."""
+        transport = PostgresTransport()
+
+        async def scenario():
+            received = asyncio.Queue()
+            listener = asyncio.ensure_future(
+                transport.listen(received.put_nowait)
+            )
+            # Publish until the listener has issued LISTEN.
+            try:
+                while received.empty():
+                    await sync_to_async(transport.publish)({'id': 1})
+                    await asyncio.sleep(0.05)
+                return await received.get()
+            finally:
+                listener.cancel()
+                await sync_to_async(connections.close_all)()
+
+        assert asyncio.run(asyncio.wait_for(scenario(), 10)) == {'id': 1}
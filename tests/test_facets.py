@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.mark.django_db
+class TestPostFacets:
+    def test_facets_are_omitted_by_default(self, api_client, published_post):
+        """Test that facet counts are opt-in."""
+        response = api_client.get(reverse('post-list'))
+
+        assert 'facets' not in response.data
+
+    def test_facet_counts_follow_the_filters(
+        self,
+        api_client,
+        user,
+        published_post,
+        published_post_by_another_user,
+        draft_post,
+        tag_python,
+        tag_django,
+    ):
+        """Test that tag, author and month counts cover the matched posts."""
+        published_post.tags.add(tag_python, tag_django)
+        published_post_by_another_user.tags.add(tag_python)
+        draft_post.tags.add(tag_django)
+        response = api_client.get(
+            reverse('post-list'), {'facets': 'tags,authors,months'}
+        )
+
+        facets = response.data['facets']
+        assert facets['tags'] == [
+            {'value': 'python', 'count': 2},
+            {'value': 'Django', 'count': 1},
+        ]
+        assert sorted(item['value'] for item in facets['authors']) == [
+            'otheruser',
+            'testuser',
+        ]
+        assert sum(item['count'] for item in facets['months']) == 2
+
+        response = api_client.get(
+            reverse('post-list'), {'facets': 'tags', 'author': 'otheruser'}
+        )
+
+        assert response.data['facets'] == {
+            'tags': [{'value': 'python', 'count': 1}]
+        }
+
+    def test_facets_are_one_query(self, api_client, published_post):
+        """Test that all requested facets cost a single extra query."""
+        url = reverse('post-list')
+        api_client.get(url)
+
+        with CaptureQueriesContext(connection) as plain:
+            api_client.get(url)
+        with CaptureQueriesContext(connection) as faceted:
+            api_client.get(url, {'facets': 'tags,authors,months'})
+
+        assert len(faceted) == len(plain) + 1
+
+    def test_unknown_facet_is_rejected(self, api_client):
+        """Test that only the supported facets are accepted."""
+        response = api_client.get(reverse('post-list'), {'facets': 'colors'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from blog.models import Post
+
+
+@pytest.mark.django_db
+class TestPostFeeds:
+    def test_feed_formats(self, client, published_post, draft_post):
+        """Test that RSS, Atom and JSON Feed list published posts."""
+        rss = client.get(reverse('post-feed'))
+        atom = client.get(reverse('post-feed', args=['atom']))
+        json_feed = client.get(reverse('post-feed', args=['json']))
+
+        assert rss['Content-Type'].startswith('application/rss+xml')
+        assert b'<title>Published Post</title>' in rss.content
+        assert b'Draft Post' not in rss.content
+        assert atom['Content-Type'].startswith('application/atom+xml')
+        assert b'<title>Published Post</title>' in atom.content
+        items = json.loads(json_feed.content)['items']
+        assert [item['title'] for item in items] == ['Published Post']
+        assert items[0]['content_html'] == '<p>Published content</p>'
+
+    def test_unknown_format_is_not_found(self, client):
+        """Test that only the supported feed formats are served."""
+        response = client.get(reverse('post-feed', args=['yaml']))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_tag_and_author_feeds(
+        self,
+        client,
+        published_post,
+        published_post_by_another_user,
+        another_user,
+        tag_python,
+    ):
+        """Test that feeds can be narrowed to one tag or one author."""
+        published_post.tags.add(tag_python)
+
+        by_tag = client.get(reverse('tag-feed', args=['Python', 'json']))
+        by_author = client.get(
+            reverse('author-feed', args=[another_user.username, 'json'])
+        )
+
+        assert [item['title'] for item in by_tag.json()['items']] == [
+            'Published Post'
+        ]
+        assert [item['title'] for item in by_author.json()['items']] == [
+            'Another User Post'
+        ]
+        assert (
+            client.get(reverse('tag-feed', args=['missing'])).status_code
+            == status.HTTP_404_NOT_FOUND
+        )
+
+    def test_unchanged_poll_costs_one_query(self, client, published_post):
+        """Test that a conditional poll only reads the feed version."""
+        response = client.get(reverse('post-feed'))
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(
+                reverse('post-feed'), HTTP_IF_NONE_MATCH=etag
+            )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert len(queries) == 1
+
+    def test_post_change_regenerates_feed(self, client, published_post):
+        """Test that saving a post retires the cached feed."""
+        etag = client.get(reverse('post-feed'))['ETag']
+
+        published_post.title = 'Retitled Post'
+        published_post.save()
+        response = client.get(reverse('post-feed'), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert b'Retitled Post' in response.content
+
+    def test_unsignalled_change_regenerates_feed(self, client, published_post):
+        """Test that a bulk update, as commands make, retires the feed."""
+        etag = client.get(reverse('post-feed'))['ETag']
+
+        Post.objects.filter(pk=published_post.pk).update(
+            title='Bulk Retitled', updated_at=timezone.now()
+        )
+        response = client.get(reverse('post-feed'), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert b'Bulk Retitled' in response.content
+
+    def test_unknown_tag_is_cached_as_not_found(self, client):
+        """Test that polling an unknown tag only reads the feed version."""
+        url = reverse('tag-feed', args=['missing'])
+        assert client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert len(queries) == 1
+
+    def test_stale_html_is_rendered_for_the_feed(self, client, published_post):
+        """Test that posts awaiting render_posts show rendered content."""
+        Post.objects.filter(pk=published_post.pk).update(
+            content_html='', content_html_version=0
+        )
+
+        items = client.get(reverse('post-feed', args=['json'])).json()['items']
+
+        assert items[0]['content_html'] == '<p>Published content</p>'
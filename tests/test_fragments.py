@@ -0,0 +1,93 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Post
+
+
+@pytest.mark.django_db
+class TestPostFragments:
+    def get_results(self, api_client, query=''):
+        response = api_client.get(reverse('post-list') + query)
+        return json.loads(response.content)['results']
+
+    def test_cached_list_matches_serializer_output(
+        self, api_client, published_post, tag_python
+    ):
+        """Test that cached fragments render like an uncached post does."""
+        published_post.tags.add(tag_python)
+        self.get_results(api_client)
+
+        detail = api_client.get(
+            reverse('post-detail', args=[published_post.pk])
+        )
+
+        assert self.get_results(api_client) == [json.loads(detail.content)]
+
+    def test_cache_hit_skips_post_queries(
+        self, api_client, published_post, published_post_by_another_user
+    ):
+        """Test that a warm list only runs the id query."""
+        self.get_results(api_client)
+
+        with CaptureQueriesContext(connection) as cold:
+            api_client.get(reverse('post-list') + '?include=content_html')
+        with CaptureQueriesContext(connection) as warm:
+            api_client.get(reverse('post-list') + '?include=content_html')
+
+        assert len(warm) == 1
+        assert len(cold) > len(warm)
+
+    def test_rendering_stored_html_invalidates_fragment(
+        self, api_client, published_post
+    ):
+        """Test that HTML filled in by render_posts replaces empty HTML."""
+        Post.objects.filter(pk=published_post.pk).update(
+            content_html='', content_html_version=0
+        )
+        query = '?include=content_html'
+        assert self.get_results(api_client, query)[0]['content_html'] == ''
+
+        call_command('render_posts', workers=1, stdout=StringIO())
+
+        assert self.get_results(api_client, query)[0]['content_html'] == (
+            '<p>Published content</p>'
+        )
+
+    def test_tag_rename_invalidates_fragment(
+        self, api_client, published_post, tag_python
+    ):
+        """Test that renaming a tag refreshes the posts carrying it."""
+        published_post.tags.add(tag_python)
+        self.get_results(api_client)
+
+        tag_python.name = 'python3'
+        tag_python.save()
+
+        assert self.get_results(api_client)[0]['tags'] == ['python3']
+
+    def test_tag_change_invalidates_fragment(
+        self, api_client, published_post, tag_python
+    ):
+        """Test that adding a tag to a post refreshes its fragment."""
+        self.get_results(api_client)
+
+        published_post.tags.add(tag_python)
+
+        assert self.get_results(api_client)[0]['tags'] == ['python']
+
+    def test_username_change_invalidates_fragment(
+        self, api_client, user, published_post
+    ):
+        """Test that renaming an author refreshes their posts."""
+        self.get_results(api_client)
+
+        user.username = 'renamed'
+        user.save()
+
+        assert self.get_results(api_client)[0]['author'] == 'renamed'
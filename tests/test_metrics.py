@@ -0,0 +1,211 @@
+import os
+import threading
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from rest_framework import status
+
+from blog.metrics import FileMetrics, LocalMetrics, exposition, get_metrics
+
+
+def sample(text, name, **labels):
+    # The value of the sample with exactly these labels.
+    wanted = ','.join(f'{k}="{v}"' for k, v in labels.items())
+    prefix = f'{name}{{{wanted}}} ' if labels else f'{name} '
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix) :])
+    return None
+
+
+class TestLocalMetrics:
+    def test_requests_are_aggregated_across_threads(self):
+        """Test that samples recorded by several threads are summed."""
+        metrics = LocalMetrics()
+
+        def record():
+            for _ in range(100):
+                metrics.record_request('PostList', 'GET', '200', 0.02, 3, 0.01)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        text = exposition(metrics.collect())
+        labels = {'view': 'PostList', 'method': 'GET', 'status': '200'}
+        name = 'blog_http_request_duration_seconds'
+        assert sample(text, f'{name}_count', **labels) == 400
+        assert sample(text, f'{name}_bucket', **labels, le=0.01) == 0
+        assert sample(text, f'{name}_bucket', **labels, le=0.025) == 400
+        assert sample(text, f'{name}_bucket', **labels, le='+Inf') == 400
+        assert sample(text, 'blog_db_queries_total', **labels) == 1200
+
+    def test_shards_of_exited_threads_are_folded(self):
+        """Test that exited threads leave their counts but not a shard."""
+        metrics = LocalMetrics()
+
+        for _ in range(3):
+            thread = threading.Thread(
+                target=metrics.record_cache, args=('feeds', 1, 0)
+            )
+            thread.start()
+            thread.join()
+        metrics.record_cache('feeds', 0, 1)
+
+        assert metrics.collect()['caches'] == {'feeds': [3, 1]}
+        assert len(metrics.shards) == 1
+
+    def test_cache_hit_ratio(self):
+        """Test that cache lookups are exposed with their hit ratio."""
+        metrics = LocalMetrics()
+        metrics.record_cache('post_fragments', 3, 1)
+
+        text = exposition(metrics.collect())
+
+        assert sample(
+            text, 'blog_cache_hit_ratio', cache='post_fragments'
+        ) == (0.75)
+        assert (
+            sample(
+                text,
+                'blog_cache_requests_total',
+                cache='post_fragments',
+                result='miss',
+            )
+            == 1
+        )
+
+
+class TestFileMetrics:
+    def test_snapshots_of_other_processes_are_added(self, tmp_path):
+        """Test that a scrape sums the snapshots written by every process."""
+        other = FileMetrics(tmp_path)
+        other.record_request('PostDetail', 'GET', '200', 0.2, 2, 0.05)
+        other.write()
+        # Pass the snapshot off as one written by another worker.
+        other.path(os.getpid()).rename(other.path(1))
+
+        metrics = FileMetrics(tmp_path)
+        metrics.record_request('PostDetail', 'GET', '200', 0.2, 1, 0.05)
+        text = exposition(metrics.collect())
+
+        labels = {'view': 'PostDetail', 'method': 'GET', 'status': '200'}
+        assert (
+            sample(text, 'blog_http_request_duration_seconds_count', **labels)
+            == 2
+        )
+        assert sample(text, 'blog_db_queries_total', **labels) == 3
+
+    def test_foreign_and_malformed_files_are_skipped(self, tmp_path):
+        """Test that files that are not snapshots do not break a scrape."""
+        (tmp_path / 'package.json').write_text('{"name": "x"}')
+        (tmp_path / 'blog-metrics-retired.json').write_text('{"name": "x"}')
+        (tmp_path / 'blog-metrics-x.json').write_text('not json')
+        metrics = FileMetrics(tmp_path)
+        metrics.record_cache('feeds', 1, 0)
+
+        assert metrics.collect()['caches'] == {'feeds': [1, 0]}
+
+    def test_snapshots_of_exited_processes_are_retired(
+        self, tmp_path, monkeypatch
+    ):
+        """Test that an exited process's counts are folded, then removed."""
+        for pid in (1000001, 1000002):
+            writer = FileMetrics(tmp_path)
+            writer.record_cache('feeds', 2, 1)
+            writer.write()
+            writer.path(os.getpid()).rename(writer.path(pid))
+        monkeypatch.setattr(
+            'blog.metrics.process_alive', lambda pid: pid == os.getpid()
+        )
+
+        metrics = FileMetrics(tmp_path)
+        assert metrics.collect()['caches'] == {'feeds': [4, 2]}
+        assert sorted(path.name for path in tmp_path.glob('*.json')) == [
+            'blog-metrics-retired.json'
+        ]
+        assert metrics.collect()['caches'] == {'feeds': [4, 2]}
+
+    def test_directory_is_required(self, settings):
+        """Test that FileMetrics refuses to guess a directory."""
+        settings.BLOG_METRICS_DIR = ''
+
+        with pytest.raises(ImproperlyConfigured):
+            FileMetrics()
+
+    def test_reused_pid_keeps_the_previous_counts(self, tmp_path):
+        """Test that a new process folds a snapshot left under its pid."""
+        previous = FileMetrics(tmp_path)
+        previous.record_cache('feeds', 5, 0)
+        previous.write()
+
+        metrics = FileMetrics(tmp_path)
+        metrics.record_cache('feeds', 1, 0)
+        metrics.write()
+
+        assert metrics.collect()['caches'] == {'feeds': [6, 0]}
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    def test_requests_are_labelled_by_view(self, api_client, published_post):
+        """Test that API requests show up under their view class."""
+        api_client.get(reverse('post-list'))
+        api_client.get(reverse('post-detail', args=[published_post.pk]))
+
+        response = api_client.get(reverse('metrics'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        name = 'blog_http_request_duration_seconds_count'
+        for view in ('PostList', 'PostDetail'):
+            labels = {'view': view, 'method': 'GET', 'status': '200'}
+            assert sample(text, name, **labels) == 1
+            assert sample(text, 'blog_db_queries_total', **labels) > 0
+
+    def test_fragment_cache_lookups_are_counted(
+        self, api_client, published_post
+    ):
+        """Test that list pages record post fragment cache lookups."""
+        api_client.get(reverse('post-list'))
+        api_client.get(reverse('post-list'))
+
+        cache = get_metrics().collect()['caches']['post_fragments']
+
+        assert cache == [1, 1]
+
+    def test_token_is_required_when_configured(self, api_client, settings):
+        """Test that a configured token must be sent as a bearer token."""
+        settings.BLOG_METRICS_TOKEN = 'secret'
+
+        assert (
+            api_client.get(reverse('metrics')).status_code
+            == status.HTTP_401_UNAUTHORIZED
+        )
+        response = api_client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret'
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_remote_callers_must_be_staff_without_a_token(
+        self, api_client, admin_client
+    ):
+        """Test that only staff or local scrapers are served by default."""
+        remote = {'REMOTE_ADDR': '203.0.113.5'}
+
+        assert api_client.get(reverse('metrics'), **remote).status_code == (
+            status.HTTP_403_FORBIDDEN
+        )
+        assert (
+            api_client.get(
+                reverse('metrics'), HTTP_X_FORWARDED_FOR='203.0.113.5'
+            ).status_code
+            == status.HTTP_403_FORBIDDEN
+        )
+        assert admin_client.get(reverse('metrics'), **remote).status_code == (
+            status.HTTP_200_OK
+        )
@@ -1,8 +1,10 @@
 import pytest
 from django.core.exceptions import ValidationError
+from django.db.models import Q
 from django.utils import timezone
 
 from blog.models import Post, Tag
+from blog.rendering import RENDERER_VERSION
 
 
 @pytest.mark.django_db
@@ -24,6 +26,42 @@ class TestPostModel:
         post.save()
         assert post.slug == 'custom-slug'
 
+    def test_content_html_is_rendered_on_save(self, user):
+        """Test that markdown content is rendered to sanitized HTML on save."""
+        post = Post.objects.create(
+            title='Rendered',
+            content='# Heading\n\n<script>alert(1)</script>',
+            author=user,
+        )
+
+        assert '<h1>Heading</h1>' in post.content_html
+        assert '<script>' not in post.content_html
+        assert post.content_html_version == RENDERER_VERSION
+
+    def test_content_html_is_re_rendered_when_content_changes(self, user):
+        """Test that changing the content re-renders the HTML."""
+        post = Post.objects.create(title='Post', content='old', author=user)
+        post = Post.objects.get(pk=post.pk)
+        post.content = '**new**'
+        post.save()
+
+        post.refresh_from_db()
+        assert post.content_html == '<p><strong>new</strong></p>'
+
+    def test_content_html_is_not_re_rendered_when_content_is_unchanged(
+        self, user
+    ):
+        """Test that saving without touching the content skips rendering."""
+        post = Post.objects.create(title='Post', content='body', author=user)
+        Post.objects.filter(pk=post.pk).update(content_html='cached')
+
+        post = Post.objects.get(pk=post.pk)
+        post.title = 'Renamed'
+        post.save()
+
+        post.refresh_from_db()
+        assert post.content_html == 'cached'
+
     def test_draft_post_cannot_have_published_at_date(self, user):
         """Test that draft posts cannot have a publication date."""
         post = Post(
@@ -85,3 +123,56 @@ class TestTagModel:
         tag = Tag(name='Django')
 
         assert str(tag) == 'Django'
+
+
+@pytest.mark.django_db
+class TestSegmentedPostQuerySet:
+    @pytest.fixture
+    def posts(self, user, another_user):
+        now = timezone.now()
+        for i, (author, status) in enumerate(
+            [(user, 'draft')] * 2
+            + [(user, 'published')] * 3
+            + [(another_user, 'published')] * 4
+        ):
+            Post.objects.create(
+                title=f'Post {i}',
+                content='Content',
+                author=author,
+                status=status,
+                published_at=(
+                    now - timezone.timedelta(days=i)
+                    if status == 'published'
+                    else None
+                ),
+            )
+
+    def test_slices_read_segments_in_turn(self, user, posts):
+        """Test that every slice matches the concatenated segments."""
+        queryset = Post.objects.order_by('-published_at')
+        segments = [Q(author=user, status='draft'), ~Q(author=user)]
+        expected = [
+            pk
+            for segment in segments
+            for pk in queryset.filter(segment).values_list('pk', flat=True)
+        ]
+        segmented = queryset.filter(
+            Q(author=user, status='draft') | ~Q(author=user)
+        ).segmented(*segments)
+
+        assert list(segmented.values_list('pk', flat=True)) == expected
+        for start in range(len(expected) + 1):
+            for stop in range(start, len(expected) + 2):
+                assert [post.pk for post in segmented[start:stop]] == expected[
+                    start:stop
+                ]
+
+    def test_ordering_again_drops_the_segments(self, user, posts):
+        """Test that an explicit order_by() replaces the segmented order."""
+        queryset = Post.objects.segmented(
+            Q(author=user), ~Q(author=user)
+        ).order_by('title')
+
+        assert [post.title for post in queryset] == sorted(
+            post.title for post in Post.objects.all()
+        )
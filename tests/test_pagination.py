@@ -0,0 +1,113 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from blog import pagination
+from blog.models import Post
+from blog.pagination import CachedCountPagination
+
+
+@pytest.mark.django_db
+class TestCachedCountPagination:
+    def test_small_counts_are_exact(
+        self, api_client, published_post, published_post_by_another_user
+    ):
+        """Test that small result sets report an exact count."""
+        response = api_client.get(reverse('post-list'))
+
+        assert response.data['count'] == 2
+        assert response.data['count_approximate'] is False
+
+    def test_counts_are_cached_per_filter(
+        self, api_client, user, published_post
+    ):
+        """Test that a repeated filter reuses the cached count."""
+        url = reverse('post-list')
+        api_client.get(url, {'author': user.username})
+        Post.objects.create(
+            title='New Post',
+            content='New content',
+            author=user,
+            status='published',
+            published_at=published_post.published_at,
+        )
+
+        cached = api_client.get(url, {'author': user.username, 'page': 1})
+        uncached = api_client.get(url, {'author': user.username.upper()})
+
+        assert cached.data['count'] == 1
+        assert uncached.data['count'] == 2
+
+    def test_large_counts_use_planner_estimate(
+        self, api_client, monkeypatch, published_post
+    ):
+        """Test that large result sets report an approximate count."""
+        monkeypatch.setattr(
+            pagination, 'explain_row_estimate', lambda queryset: 500_000
+        )
+        response = api_client.get(reverse('post-list'))
+
+        assert response.data['count'] == 500_000
+        assert response.data['count_approximate'] is True
+
+    def test_pages_past_an_estimate_are_served(
+        self, api_client, monkeypatch, published_post
+    ):
+        """Test that an underestimated count does not hide later pages."""
+        monkeypatch.setattr(CachedCountPagination, 'estimate_threshold', 0)
+        monkeypatch.setattr(
+            pagination, 'explain_row_estimate', lambda queryset: 0
+        )
+        response = api_client.get(reverse('post-list'), {'page': 3})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data['results']) == []
+
+    def test_pages_past_a_cached_count_are_served(
+        self, api_client, monkeypatch, user, published_post
+    ):
+        """Test that posts added after a count was cached can be paged to."""
+        monkeypatch.setattr(CachedCountPagination, 'page_size', 1)
+        url = reverse('post-list')
+        assert api_client.get(url, {'page': 2}).status_code == (
+            status.HTTP_404_NOT_FOUND
+        )
+        Post.objects.create(
+            title='New Post',
+            content='New content',
+            author=user,
+            status='published',
+            published_at=published_post.published_at,
+        )
+
+        response = api_client.get(url, {'page': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 1
+        assert len(response.data['results']) == 1
+
+    def test_explain_row_estimate_reads_the_plan(self, published_post):
+        """Test that the planner estimate is read from EXPLAIN output."""
+        estimate = pagination.explain_row_estimate(
+            Post.objects.filter(status='published').distinct()
+        )
+
+        assert isinstance(estimate, int)
+        assert estimate >= 1
+
+    def test_cache_key_ignores_parameter_order(self, user):
+        """Test that equivalent query strings share a cache key."""
+        factory = APIRequestFactory()
+        paginator = CachedCountPagination()
+        queryset = Post.objects.all()
+
+        def key(query):
+            request = Request(factory.get(f'/?{query}'))
+            request.user = user
+            return paginator.get_count_cache_key(queryset, request)
+
+        assert key('tags=a&tags=b&page=2') == key('tags=b&tags=a')
+        assert key('tags=a&include=content_html') == key('tags=a')
+        assert key('tags=a') != key('tags=b')
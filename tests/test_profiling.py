@@ -0,0 +1,121 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from blog.authentication import issue_token
+from blog.profiling import list_profiles, load_profile
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.BLOG_PROFILE_DIR = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+    def test_staff_request_is_profiled(
+        self, admin_client, profile_dir, published_post
+    ):
+        """Test that a flagged staff request saves a profile and SQL log."""
+        response = admin_client.get(reverse('post-list'), {'profile': '1'})
+
+        assert response.status_code == status.HTTP_200_OK
+        profile = load_profile(response['X-Profile-Id'])
+        assert profile['profiler'] == 'cprofile'
+        assert profile['path'].startswith(reverse('post-list'))
+        assert profile['queries']
+        assert 'cumulative' in profile['report']
+
+    def test_sampling_profiler_from_header(self, admin_client, profile_dir):
+        """Test that the header selects the sampling profiler."""
+        response = admin_client.get(
+            reverse('post-list'), HTTP_X_PROFILE='sample'
+        )
+
+        profile = load_profile(response['X-Profile-Id'])
+        assert profile['profiler'] == 'sample'
+        assert profile['data_path'].suffix == '.collapsed'
+
+    def test_non_staff_requests_are_not_saved(
+        self, api_client, user, profile_dir
+    ):
+        """Test that profiles of non-staff callers are discarded."""
+        api_client.force_authenticate(user)
+        response = api_client.get(reverse('post-list'), {'profile': '1'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'X-Profile-Id' not in response
+        assert list_profiles() == []
+
+    def test_anonymous_requests_are_not_profiled(
+        self, api_client, profile_dir, monkeypatch
+    ):
+        """Test that no profiler starts before the caller is known."""
+
+        def fail(*args, **kwargs):
+            raise AssertionError('Profiler started.')
+
+        monkeypatch.setattr('blog.profiling.Sampler', fail)
+        monkeypatch.setattr('blog.profiling.cProfile.Profile', fail)
+
+        for flag in ('sample', 'cprofile'):
+            response = api_client.get(
+                reverse('post-list'), HTTP_X_PROFILE=flag
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert 'X-Profile-Id' not in response
+
+    def test_token_staff_caller_is_profiled(
+        self, api_client, admin_user, profile_dir
+    ):
+        """Test that staff authenticated by API token can profile."""
+        token = issue_token(admin_user)
+
+        response = api_client.get(
+            reverse('post-list'),
+            HTTP_X_PROFILE='sample',
+            HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+
+        assert load_profile(response['X-Profile-Id'])['user'] == 'admin'
+
+    def test_only_newest_profiles_are_kept(
+        self, admin_client, profile_dir, settings
+    ):
+        """Test that old profiles are pruned past BLOG_PROFILE_KEEP."""
+        settings.BLOG_PROFILE_KEEP = 2
+        for _ in range(3):
+            admin_client.get(reverse('tag-list'), {'profile': 'sample'})
+
+        assert len(list_profiles()) == 2
+        assert len(list(profile_dir.iterdir())) == 4
+
+
+@pytest.mark.django_db
+class TestProfileAdmin:
+    def test_profiles_are_browsable(self, admin_client, profile_dir):
+        """Test that the admin lists profiles and shows their SQL."""
+        profile_id = admin_client.get(reverse('post-list'), {'profile': '1'})[
+            'X-Profile-Id'
+        ]
+
+        response = admin_client.get(reverse('profile-list'))
+        assert response.status_code == status.HTTP_200_OK
+        assert profile_id in response.content.decode()
+
+        url = reverse('profile-detail', args=[profile_id])
+        response = admin_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert 'blog_post' in response.content.decode()
+
+        response = admin_client.get(url, {'download': ''})
+        assert response['Content-Disposition'].startswith('attachment')
+
+    def test_requires_staff(self, client, user, profile_dir):
+        """Test that non-staff users are sent to the admin login."""
+        client.force_login(user)
+
+        response = client.get(reverse('profile-list'))
+
+        assert response.status_code == status.HTTP_302_FOUND
@@ -0,0 +1,172 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from blog import related
+from blog.models import Post, RelatedPost
+
+
+@pytest.mark.django_db
+class TestRelatedPosts:
+    def get_related_ids(self, api_client, post):
+        response = api_client.get(reverse('post-related', args=[post.pk]))
+        assert response.status_code == status.HTTP_200_OK
+        return [item['id'] for item in response.data]
+
+    def test_posts_are_ranked_by_shared_tags_then_recency(
+        self,
+        api_client,
+        user,
+        published_post,
+        published_post_by_another_user,
+        tag_python,
+        tag_django,
+    ):
+        """Test that more shared tags rank first, then newer posts."""
+        newer = Post.objects.create(
+            title='Newer Post',
+            content='Newer content',
+            author=user,
+            status='published',
+            published_at=published_post.published_at,
+        )
+        published_post.tags.add(tag_python, tag_django)
+        published_post_by_another_user.tags.add(tag_python, tag_django)
+        newer.tags.add(tag_python)
+
+        assert self.get_related_ids(api_client, published_post) == [
+            published_post_by_another_user.pk,
+            newer.pk,
+        ]
+
+    def test_drafts_are_not_related(
+        self, api_client, published_post, draft_post, tag_python
+    ):
+        """Test that unpublished neighbors are hidden."""
+        published_post.tags.add(tag_python)
+        draft_post.tags.add(tag_python)
+
+        assert self.get_related_ids(api_client, published_post) == []
+
+    def test_hidden_post_has_no_related_posts(
+        self, api_client, draft_post_by_another_user
+    ):
+        """Test that related posts of an invisible post are not found."""
+        url = reverse('post-related', args=[draft_post_by_another_user.pk])
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_tag_changes_refresh_neighbor_lists(
+        self,
+        api_client,
+        published_post,
+        published_post_by_another_user,
+        tag_python,
+    ):
+        """Test that adding and removing tags updates both posts' lists."""
+        published_post.tags.add(tag_python)
+        tag_python.posts.add(published_post_by_another_user)
+
+        assert self.get_related_ids(api_client, published_post) == [
+            published_post_by_another_user.pk
+        ]
+
+        published_post_by_another_user.tags.remove(tag_python)
+
+        assert self.get_related_ids(api_client, published_post) == []
+        assert not RelatedPost.objects.exists()
+
+    def test_deleting_a_tag_refreshes_neighbor_lists(
+        self,
+        published_post,
+        published_post_by_another_user,
+        tag_python,
+    ):
+        """Test that a deleted tag no longer relates its posts."""
+        published_post.tags.add(tag_python)
+        published_post_by_another_user.tags.add(tag_python)
+
+        tag_python.delete()
+
+        assert not RelatedPost.objects.exists()
+
+    def test_post_only_enters_lists_it_ranks_in(
+        self,
+        monkeypatch,
+        settings,
+        user,
+        published_post,
+        published_post_by_another_user,
+        tag_python,
+        tag_django,
+    ):
+        """Test that full lists are only written when the post outranks."""
+        settings.BLOG_RELATED_POSTS_STORED = 1
+        published_post.tags.add(tag_python, tag_django)
+        published_post_by_another_user.tags.add(tag_python, tag_django)
+        trimmed = []
+        execute = related.execute
+
+        def spy(cursor, sql, params):
+            if sql == related.TRIM_NEIGHBORS:
+                trimmed.extend(params['post_ids'])
+            execute(cursor, sql, params)
+
+        monkeypatch.setattr(related, 'execute', spy)
+
+        weaker = Post.objects.create(
+            title='Weaker',
+            content='C',
+            author=user,
+            status='published',
+            published_at=timezone.now() - timezone.timedelta(days=3),
+        )
+        weaker.tags.add(tag_python)
+
+        assert trimmed == []
+        assert not RelatedPost.objects.filter(related=weaker).exists()
+        assert RelatedPost.objects.filter(post=weaker).exists()
+
+        stronger = Post.objects.create(
+            title='Stronger',
+            content='C',
+            author=user,
+            status='published',
+            published_at=timezone.now(),
+        )
+        stronger.tags.add(tag_python, tag_django)
+
+        assert sorted(trimmed) == sorted(
+            [published_post.pk, published_post_by_another_user.pk, weaker.pk]
+        )
+        assert RelatedPost.objects.get(post=published_post).related == (
+            stronger
+        )
+
+    def test_drafts_enter_neighbor_lists_once_published(
+        self,
+        settings,
+        user,
+        published_post,
+        published_post_by_another_user,
+        tag_python,
+        tag_django,
+    ):
+        """Test that publishing a tagged draft offers it to full lists."""
+        settings.BLOG_RELATED_POSTS_STORED = 1
+        published_post.tags.add(tag_python, tag_django)
+        published_post_by_another_user.tags.add(tag_python)
+        draft = Post.objects.create(title='Draft', content='C', author=user)
+        draft.tags.add(tag_python, tag_django)
+
+        assert RelatedPost.objects.get(post=published_post).related == (
+            published_post_by_another_user
+        )
+
+        draft.status = 'published'
+        draft.published_at = timezone.now()
+        draft.save()
+
+        assert RelatedPost.objects.get(post=published_post).related == draft
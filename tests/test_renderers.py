@@ -0,0 +1,108 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from blog.renderers import ORJSONParser, ORJSONRenderer
+
+PAYLOADS = [
+    None,
+    {'id': 1, 'title': 'Plain', 'tags': ['python', 'django']},
+    {'unicode': 'café ✓ 日本', 'separators': 'a b c'},
+    {'escapes': 'quote " backslash \\ newline \n tab \t'},
+    {
+        'aware': datetime.datetime(
+            2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc
+        ),
+        'offset': datetime.datetime(
+            2024,
+            1,
+            2,
+            3,
+            4,
+            5,
+            tzinfo=datetime.timezone(datetime.timedelta(hours=2)),
+        ),
+        'naive': datetime.datetime(2024, 1, 2, 3, 4, 5),
+        'date': datetime.date(2024, 1, 2),
+        'time': datetime.time(3, 4, 5, 6),
+        'duration': datetime.timedelta(days=1, seconds=5),
+    },
+    {
+        'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'decimal': decimal.Decimal('1.25'),
+        'lazy': gettext_lazy('Not found.'),
+        'bytes': b'raw',
+        'tuple': (1, 2),
+        'set': {1},
+        'int_keys': {1: 'one'},
+    },
+    ReturnDict({'count': 0, 'results': []}, serializer=None),
+    [1.5, 0.1, -0, True, False, None, 2**53],
+]
+
+
+class TestORJSONRenderer:
+    @pytest.mark.parametrize('data', PAYLOADS)
+    def test_output_matches_drf_json_renderer(self, data):
+        """Test that the output is byte-for-byte identical to DRF's."""
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_exponent_floats_decode_to_the_same_values(self):
+        """Test that floats in exponent notation differ only in spelling."""
+        data = [1e100, 1e-7, 1.5e300]
+
+        assert json.loads(ORJSONRenderer().render(data)) == json.loads(
+            JSONRenderer().render(data)
+        )
+
+    def test_indented_output_matches_drf_json_renderer(self):
+        """Test that pretty printing falls back to DRF's formatting."""
+        data = {'a': [1, 2]}
+        media_type = 'application/json; indent=4'
+
+        assert ORJSONRenderer().render(data, media_type) == (
+            JSONRenderer().render(data, media_type)
+        )
+
+    @pytest.mark.django_db
+    def test_api_response_matches_drf_json_renderer(
+        self, api_client, published_post, tag_python
+    ):
+        """Test that a real post renders identically."""
+        published_post.tags.add(tag_python)
+        published_post.published_at = timezone.now()
+        published_post.save()
+        response = api_client.get(
+            reverse('post-detail', args=[published_post.pk])
+        )
+
+        assert ORJSONRenderer().render(response.data) == (
+            JSONRenderer().render(response.data)
+        )
+
+
+class TestORJSONParser:
+    def test_parses_like_drf_json_parser(self):
+        """Test that valid documents parse to the same data."""
+        body = '{"title": "café", "tags": [1, 2], "n": null}'.encode()
+
+        assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+            io.BytesIO(body)
+        )
+
+    @pytest.mark.parametrize('body', [b'{"a": ', b'NaN', b'{"a": Infinity}'])
+    def test_invalid_documents_raise_parse_error(self, body):
+        """Test that malformed and non-strict JSON is rejected."""
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(body))
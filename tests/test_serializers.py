@@ -2,7 +2,8 @@ import pytest
 from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
-from blog.serializers import PostSerializer
+from blog.models import Tag
+from blog.serializers import PostSerializer, TagListField, save_tags
 
 
 class TestPostSerializer:
@@ -72,3 +73,48 @@ class TestPostSerializer:
 
         assert validated_data['status'] == 'draft'
         assert validated_data['published_at'] is None
+
+
+@pytest.mark.django_db
+class TestTagListField:
+    def test_tags_are_resolved_with_one_query(
+        self, django_assert_num_queries, tag_python, tag_django
+    ):
+        """Test that ids and names are resolved by a single query."""
+        field = TagListField()
+
+        with django_assert_num_queries(1):
+            tags = field.to_internal_value(
+                [str(tag_python.id), 'django', 'Django', 'new']
+            )
+
+        assert tags[:2] == [tag_python, tag_django]
+        assert tags[2].pk is None and tags[2].name == 'new'
+
+    def test_missing_tags_are_created_in_bulk(
+        self, django_assert_num_queries, tag_python
+    ):
+        """Test that new tags are inserted by one statement and read back."""
+        tags = [tag_python, Tag(name='asyncio'), Tag(name='celery')]
+
+        with django_assert_num_queries(2):
+            saved = save_tags(tags)
+
+        assert saved[0] == tag_python
+        assert [tag.name for tag in saved[1:]] == ['asyncio', 'celery']
+        assert all(tag.pk is not None for tag in saved)
+
+    def test_non_decimal_digits_are_names(self, tag_python):
+        """Test that digit-like characters int() rejects are tag names."""
+        field = TagListField()
+
+        tags = field.to_internal_value(['²'])
+
+        assert tags[0].pk is None and tags[0].name == '²'
+
+    def test_unknown_large_id_is_a_validation_error(self):
+        """Test that an id beyond the column range is reported as missing."""
+        field = TagListField()
+
+        with pytest.raises(ValidationError, match='does not exist'):
+            field.to_internal_value(['9' * 30])
@@ -0,0 +1,159 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from blog.models import Post, RelatedPost, Task
+from blog.tasks import TASKS, enqueue, run_pending
+
+
+@pytest.fixture(autouse=True)
+def queued_tasks(settings):
+    settings.BLOG_TASKS_EAGER = False
+    settings.BLOG_TASK_MAX_ATTEMPTS = 2
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    monkeypatch.setitem(TASKS, 'record', calls.append)
+    return calls
+
+
+@pytest.fixture
+def failing(monkeypatch):
+    def fail(batch):
+        if any(args.get('fail') for args in batch):
+            raise ValueError('boom')
+
+    monkeypatch.setitem(TASKS, 'fail', fail)
+
+
+@pytest.mark.django_db
+class TestTaskQueue:
+    def test_tasks_run_in_batches_per_name(self, calls):
+        """Test that due tasks of one name reach the handler together."""
+        enqueue('record', 'a', n=1)
+        enqueue('record', 'b', n=2)
+
+        assert run_pending() == 2
+        assert calls == [[{'n': 1}, {'n': 2}]]
+        assert not Task.objects.exists()
+
+    def test_same_key_is_enqueued_once(self, calls):
+        """Test that pending work with the same key is not duplicated."""
+        enqueue('record', 'a', n=1)
+        enqueue('record', 'a', n=2)
+
+        run_pending()
+
+        assert calls == [[{'n': 2}]]
+
+    def test_failed_tasks_are_retried_then_given_up(self, failing):
+        """Test that failures back off and stop after the last attempt."""
+        enqueue('fail', 'a', fail=True)
+
+        run_pending()
+        task = Task.objects.get()
+        assert task.attempts == 1
+        assert task.last_error == 'ValueError: boom'
+        assert run_pending() == 0
+
+        Task.objects.update(run_after=task.created_at)
+        run_pending()
+        assert Task.objects.get().run_after is None
+
+        enqueue('fail', 'a', fail=True)
+        task = Task.objects.get()
+        assert task.run_after is not None
+        assert task.attempts == 0
+
+    def test_failing_task_does_not_fail_its_batch(self, failing):
+        """Test that the rest of a batch completes around a failure."""
+        enqueue('fail', 'a', fail=True)
+        enqueue('fail', 'b', fail=False)
+
+        run_pending()
+
+        assert list(Task.objects.values_list('key', flat=True)) == ['a']
+
+    def test_task_enqueued_while_running_runs_again(self, monkeypatch):
+        """Test that work re-enqueued during its run is not lost."""
+        runs = []
+
+        def reenqueue(batch):
+            runs.append(batch)
+            if len(runs) == 1:
+                enqueue('again', 'a')
+
+        monkeypatch.setitem(TASKS, 'again', reenqueue)
+        enqueue('again', 'a')
+
+        assert run_pending() == 1
+        assert run_pending() == 1
+        assert run_pending() == 0
+        assert len(runs) == 2
+
+
+@pytest.mark.django_db
+class TestQueuedSideEffects:
+    def test_retagging_refreshes_related_posts_in_the_worker(
+        self, published_post, published_post_by_another_user, tag_python
+    ):
+        """Test that related posts are refreshed by the worker."""
+        published_post.tags.add(tag_python)
+        published_post_by_another_user.tags.add(tag_python)
+
+        assert not RelatedPost.objects.exists()
+
+        call_command('run_tasks', once=True, stdout=None)
+
+        assert RelatedPost.objects.count() == 2
+
+    def test_renaming_a_tag_touches_its_posts_in_the_worker(
+        self, api_client, published_post, tag_python
+    ):
+        """Test that a tag rename reaches cached posts after the worker."""
+        published_post.tags.add(tag_python)
+        url = reverse('post-detail', args=[published_post.pk])
+        touched_at = Post.objects.get().updated_at
+
+        tag_python.name = 'python3'
+        tag_python.save()
+        assert Post.objects.get().updated_at == touched_at
+
+        run_pending()
+
+        assert Post.objects.get().updated_at > touched_at
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_deleting_a_tag_queues_one_task(
+        self,
+        published_post,
+        published_post_by_another_user,
+        tag_python,
+        tag_django,
+    ):
+        """Test that a tag deletion is fanned out to its posts by the worker."""
+        published_post.tags.add(tag_python, tag_django)
+        published_post_by_another_user.tags.add(tag_python, tag_django)
+        run_pending()
+        touched_at = Post.objects.get(pk=published_post.pk).updated_at
+
+        tag_python.delete()
+
+        task = Task.objects.get()
+        assert task.name == 'untag_posts'
+        assert sorted(task.args['post_ids']) == sorted(
+            [published_post.pk, published_post_by_another_user.pk]
+        )
+
+        run_pending()
+        run_pending()
+
+        assert Post.objects.get(pk=published_post.pk).updated_at > touched_at
+        assert set(
+            RelatedPost.objects.values_list('shared_tags', flat=True)
+        ) == {1}
+        assert not Task.objects.exists()
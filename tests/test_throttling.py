@@ -0,0 +1,75 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+
+from blog.throttling import CacheBackend, LocalBackend
+
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'list': '2/min',
+            'detail': '2/min',
+            'write': '1/min',
+        },
+    }
+
+
+@pytest.mark.django_db
+class TestSlidingWindowThrottle:
+    def test_list_requests_over_the_rate_are_throttled(
+        self, api_client, rates
+    ):
+        """Test that anonymous list requests beyond the rate get a 429."""
+        url = reverse('post-list')
+
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert 'Retry-After' in response
+
+    def test_scopes_are_counted_separately(
+        self, api_client, rates, published_post
+    ):
+        """Test that exhausting the list scope leaves detail reads alone."""
+        for _ in range(3):
+            api_client.get(reverse('post-list'))
+
+        url = reverse('post-detail', args=[published_post.id])
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_writes_use_the_write_scope(self, api_client, rates, user):
+        """Test that writes are limited by the write scope."""
+        api_client.force_authenticate(user=user)
+        url = reverse('tag-list')
+
+        response = api_client.post(url, {'name': 'first'})
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = api_client.post(url, {'name': 'second'})
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.parametrize('backend_class', [LocalBackend, CacheBackend])
+class TestThrottleBackends:
+    def test_previous_window_is_weighted_by_overlap(self, backend_class):
+        """Test that hits from the previous window count proportionally."""
+        cache.clear()
+        backend = backend_class()
+
+        assert backend.hit('key', 2, 60, 10.0)
+        assert backend.hit('key', 2, 60, 20.0)
+        assert not backend.hit('key', 2, 60, 30.0)
+
+        # Half of the previous window still overlaps: 2 * 0.5 + 0 < 2.
+        assert backend.hit('key', 2, 60, 90.0)
+        assert not backend.hit('key', 2, 60, 90.0)
+
+        assert backend.hit('key', 2, 60, 200.0)
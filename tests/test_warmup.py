@@ -0,0 +1,33 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import warmup
+from blog.apps import BlogConfig
+
+
+class TestWarmUp:
+    def test_warm_caches_touches_no_database(self):
+        """Test that the pre-fork step runs without a database."""
+        warmup.warm_caches()
+
+    def test_ready_warms_caches_when_enabled(self, monkeypatch, settings):
+        """Test that AppConfig.ready only warms up when opted in."""
+        calls = []
+        monkeypatch.setattr(warmup, 'warm_caches', lambda: calls.append(1))
+        config = BlogConfig('blog', __import__('blog'))
+
+        settings.BLOG_WARM_UP = False
+        config.ready()
+        settings.BLOG_WARM_UP = True
+        config.ready()
+
+        assert calls == [1]
+
+    @pytest.mark.django_db
+    def test_warm_connections_runs_the_hot_statements(self, published_post):
+        """Test that the post-fork step queries the list pages."""
+        with CaptureQueriesContext(connection) as queries:
+            warmup.warm_connections()
+
+        assert len(queries) == 3